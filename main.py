@@ -7,12 +7,15 @@ https://github.com/willdufault/chess/blob/main/README.md
 """
 
 from textwrap import dedent
+import sys
 import models
+from models import analyze, uci
 # import cProfile
 
-def main() -> None:
+def main(show_stats: bool = False) -> None:
     """
-    Prompt the player to select a game mode.
+    Prompt the player to select a game mode (show_stats prints the bot's search
+    statistics after each of its moves).
     """
     intro_message = dedent('''
         Thanks for playing Will Dufault's and Matthes Faria's Chess with AI Python \
@@ -32,7 +35,7 @@ def main() -> None:
         playHuman()
 
     elif mode == '2':
-        playBot()
+        playBot(show_stats)
     
     else:
         print('Error reading input. Please run the program again.\n')
@@ -80,9 +83,10 @@ def playHuman() -> None:
         model.updateMoveCount()
         team = not team
 
-def playBot() -> None:
+def playBot(show_stats: bool = False) -> None:
     """
-    Play a game of chess against the AI.
+    Play a game of chess against the AI, printing the bot's search statistics
+    after each of its moves with show_stats.
     """
     # Player selects a depth for the AI.
     # Note: You can play with a depth > 3 but it will be extremely slow.
@@ -96,7 +100,8 @@ def playBot() -> None:
             .replace(' ' * 12, ''))
         depth = input(prompt).strip()
 
-    model = models.Model(int(depth))
+    # The bot searches the reply it expects while the player thinks.
+    model = models.Model(int(depth), pondering=True)
     team = ''
 
     while team not in ('1', '2'):
@@ -116,7 +121,10 @@ def playBot() -> None:
         print("Bot thinking...")
 
         prev_move = model.bot.calculateBestMove(model.board, not team, model.move_count)
+        if show_stats:
+            print(f'Searched {model.bot.stats.summary()}')
         model.updateMoveCount()
+        model.bot.ponder(model.board, team, model.move_count)
 
     while True:
         # Player's turn to make a move.
@@ -177,10 +185,24 @@ def playBot() -> None:
         print("Bot thinking...")
 
         prev_move = model.bot.calculateBestMove(model.board, team, model.move_count)
+        if show_stats:
+            print(f'Searched {model.bot.stats.summary()}')
         model.updateMoveCount()
         
         # Switch back to player's team.
         team = not team
-        
+        model.bot.ponder(model.board, team, model.move_count)
+
+    model.bot.stopPondering()
+    model.bot.close()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python main.py analyze [FILE] [options]: batch analysis, see models/analyze.py.
+    if sys.argv[1:2] == ['analyze']:
+        analyze.main(sys.argv[2:])
+    # python main.py uci [--bitboard | --lazy-control]: talk UCI to a chess GUI, see models/uci.py.
+    elif sys.argv[1:2] == ['uci']:
+        uci.main(sys.argv[2:])
+    # python main.py [--stats]: play, --stats prints the bot's search statistics.
+    else:
+        main('--stats' in sys.argv[1:])
\ No newline at end of file
@@ -1,5 +1,7 @@
 from models.model import Model
 from models.engine import Engine
 from models.bot import Bot
-from models.board import Board
+from models.stats import SearchStats
+from models.board import Board, LazyBoard
+from models.bitboard import BitboardBoard
 from models.pieces import Pawn, Knight, Bishop, Rook, Queen, King
\ No newline at end of file
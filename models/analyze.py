@@ -0,0 +1,158 @@
+"""
+Batch analysis: search every position of a FEN or EPD file (one per line, or
+stdin) with the bot and stream the results as JSON lines, in input order. The
+positions are spread over a pool of worker processes, each with its own bot.
+
+Usage: python -m models.analyze [FILE] [--depth N] [--time MS] [--workers N]
+                                [--bitboard] [--table-size MB]
+   or: python main.py analyze ...
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator
+from models.board import Board
+from models.bitboard import BitboardBoard
+from models.bot import Bot
+from models.engine import Engine
+
+ANALYZE_BOT = None # The bot of this worker process, set up by initAnalyzer.
+ANALYZE_BOARD = Board # Board class positions are loaded into.
+
+def initAnalyzer(depth: int, time_limit: int | None, bitboard: bool, table_size: int) -> None:
+    """
+    Worker process initializer: the bot analyzing this process's positions.
+    depth is in plies, like UCI's go depth (the bot's last iteration searches
+    its depth + 1 plies).
+    """
+    global ANALYZE_BOT, ANALYZE_BOARD
+    ANALYZE_BOT = Bot(max(depth - 1, 0), Engine(), table_size, time_limit=time_limit)
+    ANALYZE_BOARD = BitboardBoard if bitboard else Board
+
+def readPositions(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """
+    (id, fen) for each position line, skipping blank lines and # comments. FEN
+    lines keep their move counters, EPD lines (4 fields then operations) take
+    their id from an id operation if they have one, otherwise the id is the
+    line number.
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+
+        if not line or line.startswith('#'):
+            continue
+
+        fields = line.split(maxsplit=4)
+        rest = fields[4] if len(fields) > 4 else ''
+        counters = rest.split()[:2]
+        position_id = str(number)
+
+        # FEN: the halfmove and fullmove counters follow the first 4 fields.
+        if counters and all(field.isdigit() for field in counters):
+            yield position_id, line
+            continue
+
+        # EPD: semicolon separated operations, like bm Nf3; id "position 1";
+        for operation in rest.split(';'):
+            opcode, _, operand = operation.strip().partition(' ')
+
+            if opcode == 'id':
+                position_id = operand.strip().strip('"')
+
+        yield position_id, ' '.join(fields[:4])
+
+def analyzePosition(position_id: str, fen: str) -> dict:
+    """
+    Search one position with this process's bot. The transposition table and
+    the last score are cleared first so every result is independent of the
+    positions before it (the score is null if no iteration finished in time).
+    """
+    bot, board = ANALYZE_BOT, ANALYZE_BOARD()
+
+    try:
+        team, move_count = board.loadFen(fen)
+    except (ValueError, IndexError, KeyError) as error:
+        return {'id': position_id, 'fen': fen, 'error': str(error)}
+
+    board.generateLegalMoves(team)
+
+    if board.checkmate(team):
+        return {'id': position_id, 'fen': fen, 'move': None, 'result': 'checkmate'}
+
+    if board.stalemate(team, move_count):
+        return {'id': position_id, 'fen': fen, 'move': None, 'result': 'stalemate'}
+
+    bot.table.clear()
+    bot.score = None
+    move = bot.search(board, team, move_count, bot.time_limit)
+    stats = bot.stats
+
+    return {'id': position_id, 'fen': fen, 'move': ''.join(map(str, move)),
+            'score': bot.score if stats.iterations else None,
+            'depth': stats.iterations[-1][0] if stats.iterations else 0, 'nodes': stats.nodes,
+            'quiescence_nodes': stats.quiescence_nodes, 'seconds': round(stats.seconds, 3),
+            'pv': [''.join(map(str, m)) for m in bot.pv]}
+
+def analyze(positions: Iterable[tuple[str, str]], depth: int, time_limit: int | None = None,
+            workers: int = 0, bitboard: bool = False, table_size: int = 16) -> Iterator[dict]:
+    """
+    Analyze (id, fen) positions, yielding the results in input order as soon as
+    they're ready. workers=0 searches them in this process, otherwise at most
+    2 positions per worker are queued so a long input isn't read all at once.
+    """
+    options = (depth, time_limit, bitboard, table_size)
+
+    if workers == 0:
+        initAnalyzer(*options)
+
+        try:
+            yield from (analyzePosition(*position) for position in positions)
+        finally:
+            ANALYZE_BOT.close()
+
+        return
+
+    with ProcessPoolExecutor(workers, initializer=initAnalyzer, initargs=options) as pool:
+        pending = deque()
+
+        for position in positions:
+            pending.append(pool.submit(analyzePosition, *position))
+
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Search a file of FEN/EPD positions and print JSON lines.')
+    parser.add_argument('file', nargs='?', default='-', help='positions, one per line (default: stdin)')
+    parser.add_argument('--depth', type=int, default=3, help='search depth in plies (ignored with --time)')
+    parser.add_argument('--time', type=int, default=None, help='time limit per position in ms')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: one per core, 0 searches in this process)')
+    parser.add_argument('--bitboard', action='store_true', help='use BitboardBoard instead of Board')
+    parser.add_argument('--table-size', type=int, default=16, help='transposition table MB per worker')
+    args = parser.parse_args(argv)
+
+    lines = sys.stdin if args.file == '-' else open(args.file)
+    start, count = time.perf_counter(), 0
+
+    try:
+        for result in analyze(readPositions(lines), args.depth, args.time, args.workers, args.bitboard,
+                              args.table_size):
+            print(json.dumps(result), flush=True)
+            count += 1
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+
+    print(f'{count} positions in {time.perf_counter() - start:.2f}s', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,520 @@
+# piece kinds (Piece.kind) are the index into BitboardBoard.pieces[team]
+from models.pieces import Pawn, Knight, Bishop, Rook, Queen, King, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+from models.board import Board
+from models.scores import MATERIAL_VALUES, POSITION_VALUES, materialTotal, pieceMaterial, positionTotal
+from models.zobrist import (WHITE_SHORT, WHITE_LONG, BLACK_SHORT, BLACK_LONG, ALL_CASTLING,
+	PIECE_KEYS, BLACK_TO_MOVE, CASTLING_KEYS, CASTLE_MASK, castlingRights, hashPosition)
+
+'''
+square index: sq = r * 8 + c, bit sq of a bitboard is set if the square is occupied
+'''
+
+# all directions (delta row, col), index into RAYS
+DIRECTIONS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+DIAGONALS = (0, 2, 5, 7)
+STRAIGHTS = (1, 3, 4, 6)
+ALL_DIRECTIONS = tuple(range(8))
+POSITIVE = tuple((dr * 8 + dc) > 0 for dr, dc in DIRECTIONS)  # ray walks to higher squares
+
+def buildStepTable(steps: tuple) -> list:
+	'''
+	bitboard of squares reachable in one step from each square
+	'''
+	table = [0] * 64
+	for r in range(8):
+		for c in range(8):
+			for dr, dc in steps:
+				if 0 <= (r1 := r + dr) < 8 and 0 <= (c1 := c + dc) < 8:
+					table[r * 8 + c] |= 1 << (r1 * 8 + c1)
+	return table
+
+def buildRayTable() -> list:
+	'''
+	bitboard of squares along each direction from each square (excluding the square itself)
+	'''
+	table = [[0] * 64 for _ in DIRECTIONS]
+	for d, (dr, dc) in enumerate(DIRECTIONS):
+		for r in range(8):
+			for c in range(8):
+				r1, c1 = r + dr, c + dc
+				while 0 <= r1 < 8 and 0 <= c1 < 8:
+					table[d][r * 8 + c] |= 1 << (r1 * 8 + c1)
+					r1 += dr
+					c1 += dc
+	return table
+
+KNIGHT_ATTACKS = buildStepTable(((1, 2), (1, -2), (-1, 2), (-1, -2), (2, 1), (2, -1), (-2, 1), (-2, -1)))
+KING_ATTACKS = buildStepTable(((1, 1), (-1, -1), (1, 0), (-1, 0), (0, 1), (0, -1), (1, -1), (-1, 1)))
+PAWN_ATTACKS = (buildStepTable(((1, -1), (1, 1))), buildStepTable(((-1, -1), (-1, 1))))  # [team][sq]
+# square a pawn on sq pushes to, [team][sq] (none from the last rank, so a push never shifts off the board)
+PAWN_PUSHES = (buildStepTable(((1, 0),)), buildStepTable(((-1, 0),)))
+RAYS = buildRayTable()
+
+def slidingAttacks(sq: int, occ: int, dirs: tuple) -> int:
+	'''
+	bitboard of squares attacked from sq along dirs, stopping at (and including) the first piece
+	'''
+	attacks = 0
+	for d in dirs:
+		ray = RAYS[d][sq]
+		if blockers := ray & occ:
+			# nearest blocker is the lowest bit on positive rays, highest on negative rays
+			first = ((blockers & -blockers) if POSITIVE[d] else (1 << (blockers.bit_length() - 1))).bit_length() - 1
+			ray ^= RAYS[d][first]
+		attacks |= ray
+	return attacks
+
+def buildSliderMasks(dirs: tuple) -> list:
+	'''
+	bitboard of the squares whose occupancy decides a slider's attacks from each square along dirs:
+	its rays without their last square (a piece on the edge doesn't block anything further)
+	'''
+	table = [0] * 64
+	for sq in range(64):
+		for d in dirs:
+			if ray := RAYS[d][sq]:
+				table[sq] |= ray ^ ((1 << (ray.bit_length() - 1)) if POSITIVE[d] else (ray & -ray))
+	return table
+
+DIAGONAL_MASKS = buildSliderMasks(DIAGONALS)
+STRAIGHT_MASKS = buildSliderMasks(STRAIGHTS)
+# slider attacks per square by the occupancy of its mask, filled in as positions come up (at most
+# 2^9 diagonal / 2^12 straight occupancies per square), so a slider costs one lookup instead of a walk
+# along each ray
+DIAGONAL_CACHE = [{} for _ in range(64)]
+STRAIGHT_CACHE = [{} for _ in range(64)]
+# ALL_RAYS[sq]: every square on a line with sq
+ALL_RAYS = [sum(RAYS[d][sq] for d in ALL_DIRECTIONS) for sq in range(64)]
+
+def diagonalAttacks(sq: int, occ: int) -> int:
+	'''
+	bitboard of squares a bishop on sq attacks (slidingAttacks along the diagonals, cached)
+	'''
+	cache, key = DIAGONAL_CACHE[sq], occ & DIAGONAL_MASKS[sq]
+	if (attacks := cache.get(key)) is None:
+		attacks = cache[key] = slidingAttacks(sq, key, DIAGONALS)
+	return attacks
+
+def straightAttacks(sq: int, occ: int) -> int:
+	'''
+	bitboard of squares a rook on sq attacks (slidingAttacks along the rank and file, cached)
+	'''
+	cache, key = STRAIGHT_CACHE[sq], occ & STRAIGHT_MASKS[sq]
+	if (attacks := cache.get(key)) is None:
+		attacks = cache[key] = slidingAttacks(sq, key, STRAIGHTS)
+	return attacks
+
+# BYTE_COLUMNS[byte]: the columns set in one row (8 bits) of a bitboard, BYTE_SQUARES[r][byte]: those
+# squares on row r, so bitboards are walked a row at a time instead of a bit at a time
+BYTE_COLUMNS = [tuple(c for c in range(8) if (byte >> c) & 1) for byte in range(256)]
+BYTE_SQUARES = [[tuple(r * 8 + c for c in cols) for cols in BYTE_COLUMNS] for r in range(8)]
+# MOVES[sq][sqx]: the move tuple (r, c, rx, cx), shared instead of built at every node
+MOVES = [[(sq >> 3, sq & 7, sqx >> 3, sqx & 7) for sqx in range(64)] for sq in range(64)]
+
+def squares(bb: int) -> list:
+	'''
+	list of square indexes set in bitboard bb
+	'''
+	sqs = []
+	r = 0
+	while bb:
+		if byte := bb & 255:
+			sqs += BYTE_SQUARES[r][byte]
+		bb >>= 8
+		r += 1
+	return sqs
+
+class BitboardBoard:
+	'''
+	board backed by one 64-bit integer per piece type and team, with the same interface as Board
+
+	squares is kept as a mailbox so Engine and Bot can read pieces directly, control_mtx and
+	pos_mtx are derived from the bitboards when asked for
+	'''
+
+	def __init__(self):
+		self.initBoard()
+		# pieces: bitboard per piece kind, per team
+		# occupied: bitboard of all pieces, per team
+		# castling: castling rights still available (bit flags)
+		# zobrist: 64-bit key of the position, updated by every move/undo
+		# material, position: running material and position score totals (white - black) for Engine
+		# history: undo stack, one record per move
+		# halfmove_clock: moves since the last capture or pawn move (the FEN counter)
+		# legal_moves: list that contains all legal moves for cur pos (only cur team)
+
+	def initBoard(self):
+		self.squares = [[None for _ in range(8)] for _ in range (8)]
+		# pawns (black, white)
+		for c in range(8):
+			self.squares[1][c], self.squares[6][c] = Pawn(False), Pawn(True)
+		# pieces (black, white)
+		for c, cls in enumerate((Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook)):
+			self.squares[0][c], self.squares[7][c] = cls(False), cls(True)
+		self.initState()
+
+	def initState(self, team: bool = True, rights: int = ALL_CASTLING) -> None:
+		'''
+		generate the bitboards and everything else derived from the squares mailbox (team is the
+		side to move, for the zobrist key, rights the castling rights to keep of those whose king and
+		rook are home)
+		'''
+		self.castling = castlingRights(self.squares, rights)
+		self.pieces = [[0] * 6, [0] * 6]
+		self.occupied = [0, 0]
+		for r in range(8):
+			for c in range(8):
+				if cur := self.squares[r][c]:
+					self.pieces[cur.team][cur.kind] |= 1 << (r * 8 + c)
+					self.occupied[cur.team] |= 1 << (r * 8 + c)
+		self.history = []
+		self.legal_moves = []
+		self.control = None
+		self.zobrist = hashPosition(self.squares, team, self.castling)
+		self.material, self.position = materialTotal(self.squares), positionTotal(self.squares)
+		self.piece_material = pieceMaterial(self.squares)
+		self.halfmove_clock = 0
+
+	@property
+	def white_king_pos(self) -> tuple:
+		return divmod(self.pieces[True][KING].bit_length() - 1, 8)
+
+	@property
+	def black_king_pos(self) -> tuple:
+		return divmod(self.pieces[False][KING].bit_length() - 1, 8)
+
+	@property
+	def pos_mtx(self) -> list:
+		'''
+		binary/null matrix that contains info about what team each piece is on
+		'''
+		return [[cur.team if (cur := self.squares[r][c]) else None for c in range(8)] for r in range(8)]
+
+	@property
+	def control_mtx(self) -> list:
+		'''
+		matrix that contains info about what pieces control what squares (both teams), built on
+		first use after each move
+		'''
+		if self.control is None:
+			self.generateControlMatrix()
+		return self.control
+
+	def move(self, r: int, c: int, rx: int, cx: int) -> None:
+		'''
+		move piece @ r,c -> rx,cx
+		'''
+		sq, sqx = r * 8 + c, rx * 8 + cx
+		p1, p2 = self.squares[r][c], self.squares[rx][cx]
+		team, kind = p1.team, p1.kind
+		self.history.append([r, c, rx, cx, p1, p2, self.castling, None, self.zobrist, self.material, self.position,
+			self.halfmove_clock, self.piece_material])
+		self.halfmove_clock = 0 if kind == PAWN or p2 is not None else self.halfmove_clock + 1
+		keys = PIECE_KEYS[p1.kind][team]
+		key = self.zobrist ^ BLACK_TO_MOVE ^ keys[sq] ^ keys[sqx]
+		values = POSITION_VALUES[p1.kind][team]
+		self.position += values[sqx] - values[sq]
+		# capture
+		if p2 is not None:
+			self.pieces[p2.team][p2.kind] ^= 1 << sqx
+			self.occupied[p2.team] ^= 1 << sqx
+			key ^= PIECE_KEYS[p2.kind][p2.team][sqx]
+			self.material -= MATERIAL_VALUES[p2.kind][p2.team]
+			self.position -= POSITION_VALUES[p2.kind][p2.team][sqx]
+			if p2.kind != PAWN:
+				black, white = self.piece_material
+				self.piece_material = (black, white - p2.value) if p2.team else (black - p2.value, white)
+		# move
+		self.pieces[team][kind] ^= (1 << sq) | (1 << sqx)
+		self.occupied[team] ^= (1 << sq) | (1 << sqx)
+		self.squares[r][c], self.squares[rx][cx] = None, p1
+		# castle (king moves two squares), bring the rook over
+		if kind == KING and abs(cx - c) == 2:
+			rc, rcx = (7, 5) if cx == 6 else (0, 3)
+			rook_bits = (1 << (r * 8 + rc)) | (1 << (r * 8 + rcx))
+			self.pieces[team][ROOK] ^= rook_bits
+			self.occupied[team] ^= rook_bits
+			self.squares[r][rc], self.squares[r][rcx] = None, self.squares[r][rc]
+			key ^= PIECE_KEYS[ROOK][team][r * 8 + rc] ^ PIECE_KEYS[ROOK][team][r * 8 + rcx]
+			self.position += POSITION_VALUES[ROOK][team][r * 8 + rcx] - POSITION_VALUES[ROOK][team][r * 8 + rc]
+		castling = self.castling & CASTLE_MASK[sq] & CASTLE_MASK[sqx]
+		self.zobrist = key ^ CASTLING_KEYS[self.castling] ^ CASTLING_KEYS[castling]
+		self.castling = castling
+		self.control = None
+
+	def undo(self, r: int = None, c: int = None, rx: int = None, cx: int = None,
+			p1: object = None, p2: object = None) -> None:
+		'''
+		undo the last move (arguments are accepted for compatibility with Board.undo, the undo
+		stack already knows everything needed)
+		'''
+		r, c, rx, cx, p1, p2, castling, promoted, key, self.material, self.position, self.halfmove_clock, \
+			self.piece_material = self.history.pop()
+		sq, sqx = r * 8 + c, rx * 8 + cx
+		team, kind = p1.team, p1.kind
+		# demote
+		if promoted is not None:
+			self.pieces[team][promoted] ^= 1 << sqx
+			self.pieces[team][PAWN] ^= 1 << sqx
+		# uncastle
+		if kind == KING and abs(cx - c) == 2:
+			rc, rcx = (7, 5) if cx == 6 else (0, 3)
+			rook_bits = (1 << (r * 8 + rc)) | (1 << (r * 8 + rcx))
+			self.pieces[team][ROOK] ^= rook_bits
+			self.occupied[team] ^= rook_bits
+			self.squares[r][rc], self.squares[r][rcx] = self.squares[r][rcx], None
+		# unmove
+		self.pieces[team][kind] ^= (1 << sq) | (1 << sqx)
+		self.occupied[team] ^= (1 << sq) | (1 << sqx)
+		self.squares[r][c], self.squares[rx][cx] = p1, p2
+		# uncapture
+		if p2 is not None:
+			self.pieces[p2.team][p2.kind] ^= 1 << sqx
+			self.occupied[p2.team] ^= 1 << sqx
+		self.castling = castling
+		self.zobrist = key
+		self.control = None
+
+	def promote(self, rx: int, cx: int, cls: type) -> None:
+		'''
+		replace the pawn that just moved to rx,cx with a new piece of type cls
+		'''
+		team = self.squares[rx][cx].team
+		self.squares[rx][cx] = cls(team)
+		self.pieces[team][PAWN] ^= 1 << (rx * 8 + cx)
+		self.pieces[team][cls.kind] ^= 1 << (rx * 8 + cx)
+		self.history[-1][7] = cls.kind
+		self.zobrist ^= PIECE_KEYS[PAWN][team][rx * 8 + cx] ^ PIECE_KEYS[cls.kind][team][rx * 8 + cx]
+		self.material += MATERIAL_VALUES[cls.kind][team] - MATERIAL_VALUES[PAWN][team]
+		self.position += POSITION_VALUES[cls.kind][team][rx * 8 + cx] - POSITION_VALUES[PAWN][team][rx * 8 + cx]
+		black, white = self.piece_material
+		self.piece_material = (black, white + cls.value) if team else (black + cls.value, white)
+		self.control = None
+
+	def push(self, move: tuple, promotion: type = Queen) -> None:
+		'''
+		play move (r, c, rx, cx), pop takes it back (a pawn reaching the last rank becomes a promotion,
+		None leaves it a pawn)
+		'''
+		r, c, rx, cx = move
+		self.move(r, c, rx, cx)
+		if (self.squares[rx][cx].kind == PAWN) and (rx in (0, 7)) and (promotion is not None):
+			self.promote(rx, cx, promotion)
+
+	def pop(self) -> None:
+		'''
+		take back the last move played with push
+		'''
+		self.undo()
+
+	# these only push, so they are shared with Board
+	makeHumanMove = Board.makeHumanMove
+	makeBotMove = Board.makeBotMove
+
+	# control and position info is derived from the bitboards, nothing to keep up to date
+	def updateControlMatrix(self, *args) -> None:
+		pass
+
+	def generatePositionMatrix(self) -> None:
+		pass
+
+	def attacked(self, sq: int, team: bool, occ: int = None, captured: int = 0) -> bool:
+		'''
+		if square sq is attacked by the given team
+
+		occ overrides the occupancy and captured masks out a piece of team that has just been taken,
+		so a move can be tested without making it
+		'''
+		if occ is None:
+			occ = self.occupied[0] | self.occupied[1]
+		p = self.pieces[team]
+		alive = ~captured
+		return bool((KNIGHT_ATTACKS[sq] & p[KNIGHT] & alive)
+			or (PAWN_ATTACKS[not team][sq] & p[PAWN] & alive)
+			or (KING_ATTACKS[sq] & p[KING])
+			or (diagonalAttacks(sq, occ) & (p[BISHOP] | p[QUEEN]) & alive)
+			or (straightAttacks(sq, occ) & (p[ROOK] | p[QUEEN]) & alive))
+
+	makeNullMove = Board.makeNullMove
+	undoNullMove = Board.undoNullMove
+
+	def capturedBack(self, r: int, c: int, rx: int, cx: int) -> bool:
+		'''
+		if the piece moving r,c -> rx,cx could be taken on rx,cx by the other team
+		'''
+		sq = r * 8 + c
+		return self.attacked(rx * 8 + cx, not self.squares[r][c].team, (self.occupied[0] | self.occupied[1]) ^ (1 << sq))
+
+	def check(self, team: bool) -> bool:
+		'''
+		if the given team is currently in check
+		'''
+		return self.attacked(self.pieces[team][KING].bit_length() - 1, not team)
+
+	# these only read squares and legal_moves, so they are shared with Board
+	pack = Board.pack
+	unpack = Board.unpack
+	placePieces = Board.placePieces
+	loadFen = Board.loadFen
+	toFen = Board.toFen
+	stalemate = Board.stalemate
+	checkmate = Board.checkmate
+	printBoard = Board.printBoard
+	printPositionMatrix = Board.printPositionMatrix
+	printControlMatrix = Board.printControlMatrix
+	printLegalMoves = Board.printLegalMoves
+
+	def generateControlMatrix(self) -> None:
+		'''
+		generate matrix that contains info about all squares under control/attack (both teams)
+		'''
+		mtx = [[0 for _ in range(8)] for _ in range(8)]
+		occ = self.occupied[0] | self.occupied[1]
+		for sq in squares(occ):
+			bit, attacks, r = 1 << sq, self.attacks(sq, occ), 0
+			# a row of the attacks at a time
+			while attacks:
+				if byte := attacks & 255:
+					row = mtx[r]
+					for c in BYTE_COLUMNS[byte]:
+						row[c] |= bit
+				attacks >>= 8
+				r += 1
+		self.control = mtx
+
+	def attacks(self, sq: int, occ: int) -> int:
+		'''
+		bitboard of squares attacked by the piece on sq
+		'''
+		cur = self.squares[sq >> 3][sq & 7]
+		match cur.kind:
+			case Pawn.kind:
+				return PAWN_ATTACKS[cur.team][sq]
+			case Knight.kind:
+				return KNIGHT_ATTACKS[sq]
+			case Bishop.kind:
+				return diagonalAttacks(sq, occ)
+			case Rook.kind:
+				return straightAttacks(sq, occ)
+			case Queen.kind:
+				return diagonalAttacks(sq, occ) | straightAttacks(sq, occ)
+			case _:  # KING
+				return KING_ATTACKS[sq]
+
+	def generateLegalMoves(self, team: bool) -> None:
+		'''
+		generate list that contains all legal moves for given team with cur pos
+		'''
+		self.generatePseudoLegalMoves(team)
+		self.legal_moves = [m for m in self.pseudo_moves if self.isLegal(*m)]
+
+	def generatePseudoLegalMoves(self, team: bool) -> None:
+		'''
+		generate list that contains all moves for given team with cur pos, without checking if
+		they leave the king in check (isLegal checks that per move)
+		'''
+		own, enemy = self.occupied[team], self.occupied[not team]
+		occ = own | enemy
+		pseudo = []
+
+		def addMoves(sq: int, targets: int) -> None:
+			moves = MOVES[sq]
+			for sqx in squares(targets):
+				pseudo.append(moves[sqx])
+
+		pushes, home = PAWN_PUSHES[team], 6 if team else 1  # pawn home row
+		for sq in squares(own):
+			match self.squares[sq >> 3][sq & 7].kind:
+				case Pawn.kind:
+					targets = PAWN_ATTACKS[team][sq] & enemy
+					if push := pushes[sq] & ~occ:
+						targets |= push
+						# push 2 (first push only)
+						if (sq >> 3) == home:
+							targets |= pushes[push.bit_length() - 1] & ~occ
+					addMoves(sq, targets)
+				case Knight.kind:
+					addMoves(sq, KNIGHT_ATTACKS[sq] & ~own)
+				case Bishop.kind:
+					addMoves(sq, diagonalAttacks(sq, occ) & ~own)
+				case Rook.kind:
+					addMoves(sq, straightAttacks(sq, occ) & ~own)
+				case Queen.kind:
+					addMoves(sq, (diagonalAttacks(sq, occ) | straightAttacks(sq, occ)) & ~own)
+				case _:  # KING
+					addMoves(sq, KING_ATTACKS[sq] & ~own)
+		# castle
+		r = 7 if team else 0
+		short, long = (WHITE_SHORT, WHITE_LONG) if team else (BLACK_SHORT, BLACK_LONG)
+		if (self.castling & short) and not (occ >> (r * 8 + 5)) & 3 and (self.pieces[team][ROOK] >> (r * 8 + 7)) & 1:
+			pseudo.append((r, 4, r, 6))
+		if (self.castling & long) and not (occ >> (r * 8 + 1)) & 7 and (self.pieces[team][ROOK] >> (r * 8)) & 1:
+			pseudo.append((r, 4, r, 2))
+		self.pseudo_moves = pseudo
+		self.legality = self.check(team)
+
+	def generateCaptures(self, team: bool) -> None:
+		'''
+		generate list that contains the legal captures and promotions for given team with cur pos
+		(for quiescence search, without generating the quiet moves)
+		'''
+		own, enemy = self.occupied[team], self.occupied[not team]
+		occ = own | enemy
+		captures = []
+
+		def addMoves(sq: int, targets: int) -> None:
+			moves = MOVES[sq]
+			for sqx in squares(targets):
+				captures.append(moves[sqx])
+
+		pushes, last = PAWN_PUSHES[team], 1 if team else 6  # row a pawn promotes from
+		for sq in squares(own):
+			match self.squares[sq >> 3][sq & 7].kind:
+				case Pawn.kind:
+					targets = PAWN_ATTACKS[team][sq] & enemy
+					# promote
+					if (sq >> 3) == last:
+						targets |= pushes[sq] & ~occ
+					addMoves(sq, targets)
+				case Knight.kind:
+					addMoves(sq, KNIGHT_ATTACKS[sq] & enemy)
+				case Bishop.kind:
+					addMoves(sq, diagonalAttacks(sq, occ) & enemy)
+				case Rook.kind:
+					addMoves(sq, straightAttacks(sq, occ) & enemy)
+				case Queen.kind:
+					addMoves(sq, (diagonalAttacks(sq, occ) | straightAttacks(sq, occ)) & enemy)
+				case _:  # KING
+					addMoves(sq, KING_ATTACKS[sq] & enemy)
+		in_check = self.check(team)
+		self.capture_moves = [m for m in captures if self.isLegal(*m, in_check)]
+
+	def isLegal(self, r: int, c: int, rx: int, cx: int, legality: bool = None) -> bool:
+		'''
+		if the pseudo-legal move r,c -> rx,cx doesn't leave the mover's king in check
+
+		the bitboards answer that with one attack test, so unlike Board no pin info has to be kept per
+		position, legality is only whether the mover is in check (defaults to the last
+		generatePseudoLegalMoves)
+		'''
+		sq, sqx = r * 8 + c, rx * 8 + cx
+		team = self.squares[r][c].team
+		king = self.pieces[team][KING]
+		# not in check and not leaving a line through the king, so nothing can be uncovered
+		in_check = self.legality if legality is None else legality
+		if not in_check and not ((king | ALL_RAYS[king.bit_length() - 1]) >> sq) & 1:
+			return True
+		occ = self.occupied[0] | self.occupied[1]
+		if (king >> sq) & 1:
+			# castle (same rule as Board: only the position after castling must be safe)
+			if abs(cx - c) == 2:
+				return not self.attacked(sqx, not team, occ ^ ((0b11110000 if cx == 6 else 0b00011101) << (r * 8)))
+			return not self.attacked(sqx, not team, (occ ^ (1 << sq)) | (1 << sqx), 1 << sqx)
+		# king must not be attacked once the piece has left sq (and anything on sqx is taken)
+		return not self.attacked(king.bit_length() - 1, not team, (occ ^ (1 << sq)) | (1 << sqx), 1 << sqx)
+
+	def hasLegalMove(self, legality: bool = None) -> bool:
+		'''
+		if any of the generated pseudo-legal moves is legal (stops at the first one)
+		'''
+		return any(self.isLegal(*m, legality) for m in self.pseudo_moves)
@@ -1,11 +1,111 @@
-from models.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from models.pieces import Pawn, Knight, Bishop, Rook, Queen, King, PIECES, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+from models.zobrist import PIECE_KEYS, BLACK_TO_MOVE, CASTLING_KEYS, CASTLE_MASK, castlingRights, hashPosition
+from models.zobrist import WHITE_SHORT, WHITE_LONG, BLACK_SHORT, BLACK_LONG, ALL_CASTLING
+from models.scores import MATERIAL_VALUES, POSITION_VALUES, materialTotal, pieceMaterial, positionTotal
+
+# all moves/directions (relative to cur pos)
+KNIGHT_MOVES = ((1, 2), (1, -2), (-1, 2), (-1, -2), (2, 1), (2, -1), (-2, 1), (-2, -1))
+KING_MOVES = ((1, 1), (-1, -1), (1, 0), (-1, 0), (0, 1), (0, -1), (1, -1), (-1, 1))
+SLIDER_DIRECTIONS = {
+	BISHOP: ((1, 1), (1, -1), (-1, 1), (-1, -1)),
+	ROOK: ((1, 0), (0, 1), (-1, 0), (0, -1)),
+	QUEEN: ((1, 1), (1, -1), (-1, 1), (-1, -1), (1, 0), (0, 1), (-1, 0), (0, -1)),
+}
+def onBoard(r: int, c: int) -> bool:
+	return (0 <= r < 8) and (0 <= c < 8)
+
+def ray(r: int, c: int, dr: int, dc: int) -> tuple:
+	'''
+	squares from r,c (not included) to the edge of the board in direction dr,dc
+	'''
+	squares = []
+	while onBoard(r := r + dr, c := c + dc):
+		squares.append((r, c))
+	return tuple(squares)
+
+def bitSquares(mask: int) -> list:
+	'''
+	list of the squares (r, c) whose bit (r * 8 + c) is set in mask
+	'''
+	sqs = []
+	while mask:
+		low = mask & -mask
+		sqs.append(divmod(low.bit_length() - 1, 8))
+		mask ^= low
+	return sqs
+
+# precomputed targets per square (TABLE[r][c]), so the generators don't bounds check or build
+# offset tuples at every node
+# squares a knight / king on r,c moves to or controls
+KNIGHT_TARGETS = [[tuple((r + dr, c + dc) for dr, dc in KNIGHT_MOVES if onBoard(r + dr, c + dc))
+	for c in range(8)] for r in range(8)]
+KING_TARGETS = [[tuple((r + dr, c + dc) for dr, dc in KING_MOVES if onBoard(r + dr, c + dc))
+	for c in range(8)] for r in range(8)]
+# PAWN_ATTACKS[team][r][c]: squares a pawn of team on r,c controls (white moves up, dr = -1)
+PAWN_ATTACKS = [[[tuple((r + dr, c1) for c1 in (c - 1, c + 1) if onBoard(r + dr, c1)) for c in range(8)]
+	for r in range(8)] for dr in (1, -1)]
+# RAYS[r][c]: one ray per direction of KING_MOVES, with the sliders that move along it
+RAYS = [[tuple(ray(r, c, dr, dc) for dr, dc in KING_MOVES) for c in range(8)] for r in range(8)]
+RAY_SLIDERS = tuple((BISHOP, QUEEN) if dr and dc else (ROOK, QUEEN) for dr, dc in KING_MOVES)
+# SLIDER_RAYS[kind][r][c]: the rays a bishop / rook / queen on r,c moves along
+SLIDER_RAYS = {kind: [[tuple(ray(r, c, dr, dc) for dr, dc in dirs) for c in range(8)] for r in range(8)]
+	for kind, dirs in SLIDER_DIRECTIONS.items()}
+
+def buildBetweenTable() -> list:
+	'''
+	squares strictly between each pair of squares on the same line (empty set if they aren't on one)
+	'''
+	table = [[frozenset() for _ in range(64)] for _ in range(64)]
+	for r in range(8):
+		for c in range(8):
+			for squares in RAYS[r][c]:
+				for i, (r1, c1) in enumerate(squares):
+					table[r * 8 + c][r1 * 8 + c1] = frozenset(squares[:i])
+	return table
+
+def buildLineTable() -> list:
+	'''
+	squares of the whole line (edge to edge) through each pair of squares on the same line (empty set
+	if they aren't on one)
+	'''
+	table = [[frozenset() for _ in range(64)] for _ in range(64)]
+	for r in range(8):
+		for c in range(8):
+			for (dr, dc), squares in zip(KING_MOVES, RAYS[r][c]):
+				line = frozenset(squares + ray(r, c, -dr, -dc) + ((r, c),))
+				for r1, c1 in squares:
+					table[r * 8 + c][r1 * 8 + c1] = line
+	return table
+
+# BETWEEN[r * 8 + c][rx * 8 + cx]: squares strictly between two squares on the same line
+BETWEEN = buildBetweenTable()
+# LINE[r * 8 + c][rx * 8 + cx]: the whole line through two squares on the same line
+LINE = buildLineTable()
+# packed piece codes (Board.pack) are the piece kind + 1, black pieces have bit 3 set, 0 is an empty square
+# Board.pack size: 32 bytes of pieces, castling rights / side to move, halfmove clock, 2 bytes move count
+PACKED_SIZE = 36
+# pieces a pawn can promote to, by name (Board.makeHumanMove)
+PROMOTIONS = {"Knight": Knight, "Bishop": Bishop, "Rook": Rook, "Queen": Queen}
+# FEN letters (white) by piece code, and the FEN castling field letters
+FEN_LETTERS = ' PNBRQK'
+CASTLING_LETTERS = (('K', WHITE_SHORT), ('Q', WHITE_LONG), ('k', BLACK_SHORT), ('q', BLACK_LONG))
 
 class Board:
 	def __init__(self):
 		self.initBoard()
 		# pos_mtx: binary/null matrix that contains info about what team each piece is on
-		# control_mtx: matrix that contains info about what pieces control what squares (both teams)
+		# control_mtx: matrix of bitmasks of the squares (bit r * 8 + c) whose pieces control each square
+		# (both teams)
+		# control_counts: per team, matrix of how many of its pieces control each square
 		# legal_moves: list that contains all legal moves for cur pos (only cur team)
+		# zobrist: 64-bit key of the position (pieces, castling rights, side to move)
+		# material, position: running material and position score totals (white - black) for Engine
+		# piece_material: (black, white) value of each team's pieces other than pawns and the king, for
+		# null-move pruning (a tuple, replaced when it changes so the undo stack can keep it)
+		# castling: castling rights still held (bit flags), lost when a king or rook leaves / is taken on
+		# its home square
+		# history: undo stack, one record per move (see move), popped by undo
+		# halfmove_clock: moves since the last capture or pawn move (the FEN counter)
 	
 	def initBoard(self):
 		self.squares = [[None for _ in range(8)] for _ in range (8)]
@@ -21,11 +121,33 @@ class Board:
 		self.squares[0][5], self.squares[7][5] = Bishop(False), Bishop(True)
 		self.squares[0][6], self.squares[7][6] = Knight(False), Knight(True)
 		self.squares[0][7], self.squares[7][7] = Rook(False), Rook(True)
+		self.initState()
+
+	def initState(self, team: bool = True, rights: int = ALL_CASTLING) -> None:
+		'''
+		set up everything derived from squares (team is the side to move, for the zobrist key, rights
+		the castling rights to keep of those whose king and rook are home)
+		'''
 		# king pos
-		self.black_king_pos, self.white_king_pos = (0, 4), (7, 4)
+		for r in range(8):
+			for c in range(8):
+				if ((cur := self.squares[r][c]) is not None) and (cur.kind == KING):
+					if cur.team:
+						self.white_king_pos = (r, c)
+					else:
+						self.black_king_pos = (r, c)
 		# generate matrices
 		self.generateControlMatrix()
 		self.generatePositionMatrix()
+		self.legal_moves = []
+		# zobrist key
+		self.castling = castlingRights(self.squares, rights)
+		self.zobrist = hashPosition(self.squares, team, self.castling)
+		# running evaluation totals
+		self.material, self.position = materialTotal(self.squares), positionTotal(self.squares)
+		self.piece_material = pieceMaterial(self.squares)
+		self.history = []
+		self.halfmove_clock = 0
 
 	def move(self, r: int, c: int, rx: int, cx: int) -> None:
 		'''
@@ -33,52 +155,82 @@ class Board:
 		'''
 		move = (r, c, rx, cx)
 		p = self.squares[r][c]  # piece @ r,c
-		king = p.__class__.__name__ == "King"
+		king = p.kind == KING
+		# undo record: the move, the pieces it moves and takes, the castling rights, the kind promoted
+		# to (set by promote), the zobrist key, the evaluation totals, the halfmove clock, the
+		# control matrix before the move (set by push) and the piece material
+		self.history.append([r, c, rx, cx, p, self.squares[rx][cx], self.castling, None, self.zobrist, self.material,
+			self.position, self.halfmove_clock, None, self.piece_material])
+		# update zobrist key before the squares change
+		keys = PIECE_KEYS[p.kind][p.team]
+		key = self.zobrist ^ BLACK_TO_MOVE ^ keys[r * 8 + c] ^ keys[rx * 8 + cx]
+		# update evaluation totals
+		self.halfmove_clock = 0 if p.kind == PAWN or self.squares[rx][cx] is not None else self.halfmove_clock + 1
+		values = POSITION_VALUES[p.kind][p.team]
+		self.position += values[rx * 8 + cx] - values[r * 8 + c]
+		if (p2 := self.squares[rx][cx]) is not None:
+			key ^= PIECE_KEYS[p2.kind][p2.team][rx * 8 + cx]
+			self.material -= MATERIAL_VALUES[p2.kind][p2.team]
+			self.position -= POSITION_VALUES[p2.kind][p2.team][rx * 8 + cx]
+			if p2.kind != PAWN:
+				black, white = self.piece_material
+				self.piece_material = (black, white - p2.value) if p2.team else (black - p2.value, white)
+		# castling rights are lost when anything moves from / to a king or rook home square
+		if (rights := self.castling & CASTLE_MASK[r * 8 + c] & CASTLE_MASK[rx * 8 + cx]) != self.castling:
+			key ^= CASTLING_KEYS[self.castling] ^ CASTLING_KEYS[rights]
+			self.castling = rights
 		# short castle
 		if king and (move in ((0, 4, 0, 6), (7, 4, 7, 6))):
-			p.moved = self.squares[r][7].moved = True
 			self.squares[r][4], self.squares[r][6] = None, p
 			self.squares[r][7], self.squares[r][5] = None, self.squares[r][7]
+			self.pos_mtx[r][4] = self.pos_mtx[r][7] = None
+			self.pos_mtx[r][5] = self.pos_mtx[r][6] = p.team
+			key ^= PIECE_KEYS[ROOK][p.team][r * 8 + 7] ^ PIECE_KEYS[ROOK][p.team][r * 8 + 5]
+			self.position += POSITION_VALUES[ROOK][p.team][r * 8 + 5] - POSITION_VALUES[ROOK][p.team][r * 8 + 7]
 		# long castle
 		elif king and (move in ((0, 4, 0, 2), (7, 4, 7, 2))):
-			p.moved = self.squares[r][0].moved = True
 			self.squares[r][4], self.squares[r][2] = None, p
 			self.squares[r][0], self.squares[r][3] = None, self.squares[r][0]
+			self.pos_mtx[r][4] = self.pos_mtx[r][0] = None
+			self.pos_mtx[r][2] = self.pos_mtx[r][3] = p.team
+			key ^= PIECE_KEYS[ROOK][p.team][r * 8] ^ PIECE_KEYS[ROOK][p.team][r * 8 + 3]
+			self.position += POSITION_VALUES[ROOK][p.team][r * 8 + 3] - POSITION_VALUES[ROOK][p.team][r * 8]
 		# normal move
 		else:
 			self.squares[r][c], self.squares[rx][cx] = None, p
-			if hasattr(p, "moved"):
-				p.moved = True
+			self.pos_mtx[r][c], self.pos_mtx[rx][cx] = None, p.team
 		# update king pos
 		if king:
 			if p.team:
 				self.white_king_pos = (rx, cx)
 			else:
 				self.black_king_pos = (rx, cx)
+		self.zobrist = key
 	
-	def undo(self, r: int, c: int, rx: int, cx: int, p1: object, p2: object, p1_moved: bool) -> None:
+	def undo(self) -> None:
 		'''
-		undo given move
-
-		set piece @ r,c to p1, set piece @ rx,cx to p2, revert p1.moved
+		undo the last move (the undo stack knows everything needed)
 		'''
+		r, c, rx, cx, p1, p2, self.castling, _, self.zobrist, self.material, self.position, self.halfmove_clock, _, \
+			self.piece_material = self.history.pop()
 		move = (r, c, rx, cx)
-		king = p1.__class__.__name__ == "King"
+		king = p1.kind == KING
 		# short castle
 		if king and (move in ((0, 4, 0, 6), (7, 4, 7, 6))):
 			self.squares[r][4], self.squares[r][7] = self.squares[r][6], self.squares[r][5]
 			self.squares[r][5] = self.squares[r][6] = None
-			self.squares[r][4].moved = self.squares[r][7].moved = False
+			self.pos_mtx[r][5] = self.pos_mtx[r][6] = None
+			self.pos_mtx[r][4] = self.pos_mtx[r][7] = p1.team
 		# long castle
 		elif king and (move in ((0, 4, 0, 2), (7, 4, 7, 2))):
 			self.squares[r][4], self.squares[r][0] = self.squares[r][2], self.squares[r][3]
 			self.squares[r][3] = self.squares[r][2] = None
-			self.squares[r][4].moved = self.squares[r][0].moved = False
+			self.pos_mtx[r][3] = self.pos_mtx[r][2] = None
+			self.pos_mtx[r][4] = self.pos_mtx[r][0] = p1.team
 		# normal move
 		else:
 			self.squares[r][c], self.squares[rx][cx] = p1, p2
-			if hasattr(p1, "moved"):
-				p1.moved = p1_moved
+			self.pos_mtx[r][c], self.pos_mtx[rx][cx] = p1.team, (p2.team if p2 else None)
 		# revert king pos
 		if king:
 			if p1.team:
@@ -86,64 +238,77 @@ class Board:
 			else:
 				self.black_king_pos = (r, c)
 
-	def makeHumanMove(self, r: int, c: int, rx: int, cx: int) -> None:
+	def push(self, move: tuple, promotion: type = Queen) -> None:
 		'''
-		precondition: move is legal
+		play move (r, c, rx, cx) and keep everything pop needs to take it back on the undo stack (a
+		pawn reaching the last rank becomes a promotion, None leaves it a pawn)
 		'''
-
-		def promote() -> str:
-			# promote pawn if on last rank
-			inp = None
-			while inp not in ("Knight", "Bishop", "Rook", "Queen"):
-				inp = input("promote pawn to ... (\"Knight\", \"Bishop\", \"Rook\", \"Queen\")\n").strip()
-			return inp
-		
+		r, c, rx, cx = move
 		p1, p2 = self.squares[r][c], self.squares[rx][cx]
-		# update board state
 		self.move(r, c, rx, cx)
+		# keep the control matrix for pop (castling builds a new one, any other move updates its rows in
+		# place so they are copied), restoring it is cheaper than walking the move's control back
+		mtx, counts = self.control_mtx, self.control_counts
+		if (p1.kind == KING) and (abs(cx - c) == 2):
+			self.history[-1][12] = (mtx, counts)
+		else:
+			self.history[-1][12] = ([row[:] for row in mtx], [[row[:] for row in team] for team in counts])
 		self.updateControlMatrix(r, c, rx, cx, p1, p2)
-		self.generatePositionMatrix()
-		# promote
-		if ((cur := self.squares[rx][cx]).__class__.__name__ == "Pawn") and (rx in (0, 7)):
-			match promote():
-				case "Knight":
-					self.squares[rx][cx] = Knight(cur.team)
-				case "Bishop":
-					self.squares[rx][cx] = Bishop(cur.team)
-				case "Rook":
-					self.squares[rx][cx] = Rook(cur.team)
-					self.squares.moved = True
-				case "Queen":
-					self.squares[rx][cx] = Queen(cur.team)
-				case _:
-					pass
-			self.generateControlMatrix()
+		if (p1.kind == PAWN) and (rx in (0, 7)) and (promotion is not None):
+			self.promote(rx, cx, promotion)
+
+	def pop(self) -> None:
+		'''
+		take back the last move played with push (promotions included)
+		'''
+		control = self.history[-1][12]
+		self.undo()
+		self.control_mtx, self.control_counts = control
+
+	def promote(self, rx: int, cx: int, cls: type) -> None:
+		'''
+		replace the pawn that just moved to rx,cx with a piece of type cls
+		'''
+		pawn, piece = self.squares[rx][cx], cls(self.squares[rx][cx].team)
+		# same square, so only the piece's own control changes
+		self.removeAllControl(rx, cx)
+		self.squares[rx][cx] = piece
+		self.addAllControl(rx, cx)
+		self.history[-1][7] = cls.kind
+		self.zobrist ^= PIECE_KEYS[PAWN][pawn.team][rx * 8 + cx] ^ PIECE_KEYS[cls.kind][pawn.team][rx * 8 + cx]
+		self.promoteScores(rx, cx, pawn, piece)
+
+	def makeHumanMove(self, r: int, c: int, rx: int, cx: int, promotion: str | None = None) -> None:
+		'''
+		precondition: move is legal (a promoting pawn becomes promotion, "Knight" / "Bishop" / "Rook" /
+		"Queen", asked for if not given)
+		'''
+		if (self.squares[r][c].kind == PAWN) and (rx in (0, 7)):
+			while promotion not in PROMOTIONS:
+				promotion = input("promote pawn to ... (\"Knight\", \"Bishop\", \"Rook\", \"Queen\")\n").strip()
+		self.push((r, c, rx, cx), PROMOTIONS.get(promotion))
 
 	def makeBotMove(self, r: int, c: int, rx: int, cx: int) -> None:
-		p1, p2 = self.squares[r][c], self.squares[rx][cx]
-		# update board state
-		self.move(r, c, rx, cx)
-		self.updateControlMatrix(r, c, rx, cx, p1, p2)
-		self.generatePositionMatrix()
 		# auto promote to queen
-		if ((cur := self.squares[rx][cx]).__class__.__name__ == "Pawn") and (rx in (0, 7)):
-			self.squares[rx][cx] = Queen(cur.team)
-			self.generateControlMatrix()
+		self.push((r, c, rx, cx))
+
+	def promoteScores(self, rx: int, cx: int, pawn: object, piece: object) -> None:
+		'''
+		update the evaluation totals for pawn @ rx,cx promoting to piece
+		'''
+		self.material += MATERIAL_VALUES[piece.kind][piece.team] - MATERIAL_VALUES[PAWN][pawn.team]
+		self.position += POSITION_VALUES[piece.kind][piece.team][rx * 8 + cx] \
+			- POSITION_VALUES[PAWN][pawn.team][rx * 8 + cx]
+		black, white = self.piece_material
+		self.piece_material = (black, white + piece.value) if piece.team else (black + piece.value, white)
 
 	def check(self, team: bool) -> bool:
 		'''
 		if the given team is currently in check
 		'''
 
-		def controls(r: int, c: int, team: bool):
-			for p in self.control_mtx[r][c]:
-				pr, pc = p
-				if self.pos_mtx[pr][pc] == team:
-					return True
-			return False
-
 		r, c = self.white_king_pos if team else self.black_king_pos
-		return controls(r, c, not team)
+		return self.control_counts[not team][r][c] > 0
 	
 	def stalemate(self, team: bool, move_count: int) -> bool:
 		'''
@@ -168,6 +333,8 @@ class Board:
 	def generatePositionMatrix(self) -> None:
 		'''
 		generate binary/null matrix that contains info about what team each piece is on
+
+		only needed when setting up a position, move/undo keep it up to date square by square
 		'''
 		mtx = [[None for _ in range(8)] for _ in range(8)]
 		for r in range(8):
@@ -175,290 +342,75 @@ class Board:
 				mtx[r][c] = cur.team if (cur := self.squares[r][c]) else None
 		self.pos_mtx = mtx
 
+	def controlledSquares(self, r: int, c: int) -> list:
+		'''
+		squares the piece @ r,c controls/attacks (sliders stop at the first piece in the way)
+		'''
+		cur = self.squares[r][c]
+		match (kind := cur.kind):
+			case Pawn.kind:
+				return PAWN_ATTACKS[cur.team][r][c]
+			case Knight.kind:
+				return KNIGHT_TARGETS[r][c]
+			case King.kind:
+				return KING_TARGETS[r][c]
+			case Bishop.kind | Rook.kind | Queen.kind:
+				squares = []
+				for rays in SLIDER_RAYS[kind][r][c]:
+					for r1, c1 in rays:
+						squares.append((r1, c1))
+						# piece here, stop
+						if self.squares[r1][c1]:
+							break
+				return squares
+			case _:
+				return ()
+
 	def generateControlMatrix(self) -> None:
 		'''
 		generate matrix that contains info about all squares under control/attack (both teams)
 		'''
-
-		def inBounds(x: int) -> bool:
-			return x in range(8)
-
-		def addControl(r: int, c: int, rx: int, cx: int) -> None:
-			mtx[rx][cx].append((r, c))
-
-		mtx = [[[] for _ in range(8)] for _ in range(8)]
+		mtx = [[0 for _ in range(8)] for _ in range(8)]
+		counts = [[[0] * 8 for _ in range(8)] for _ in range(2)]
 		for r in range(8):
 			for c in range(8):
 				if cur := self.squares[r][c]:
-					match cur.__class__.__name__:
-						case "Pawn":
-							dr = -1 if cur.team else 1  # delta row
-							if inBounds(r1 := r + dr):
-								# capture left
-								if inBounds(c1 := c - 1):
-									addControl(r, c, r1, c1)
-								# capture right
-								if inBounds(c1 := c + 1):
-									addControl(r, c, r1, c1)
-						case "Knight":
-							moves = ((1, 2), (1, -2), (-1, 2), (-1, -2),
-									 (2, 1), (2, -1), (-2, 1), (-2, -1))  # all legal moves (relative to cur pos)
-							for m in moves:
-								dr, dc = m  # delta row, col
-								if inBounds(r1 := r + dr) and inBounds(c1 := c + dc):
-									addControl(r, c, r1, c1)
-						case "Bishop":
-							dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-							for d in dirs:
-								dr, dc = d  # delta row, col
-								r1, c1 = r + dr, c + dc
-								while inBounds(r1) and inBounds(c1):
-									addControl(r, c, r1, c1)
-									# piece here, stop
-									if self.squares[r1][c1]:
-										break
-									r1 += dr
-									c1 += dc
-						case "Rook":
-							dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-							for d in dirs:
-								dr, dc = d  # delta row, col
-								# same col
-								if dr:
-									r1 = r + dr
-									while inBounds(r1):
-										addControl(r, c, r1, c)
-										# piece here, stop
-										if self.squares[r1][c]:
-											break
-										r1 += dr
-								# same row
-								else:
-									c1 = c + dc
-									while inBounds(c1):
-										addControl(r, c, r, c1)
-										# piece here, stop
-										if self.squares[r][c1]:
-											break
-										c1 += dc
-						case "Queen":
-							# diagonals
-							dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-							for d in dirs:
-								dr, dc = d  # delta row, col
-								r1, c1 = r + dr, c + dc
-								while inBounds(r1) and inBounds(c1):
-									addControl(r, c, r1, c1)
-									# piece here, stop
-									if self.squares[r1][c1]:
-										break
-									r1 += dr
-									c1 += dc
-							# straights
-							dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-							for d in dirs:
-								dr, dc = d  # delta row, col
-								# same col
-								if dr:
-									r1 = r + dr
-									while inBounds(r1):
-										addControl(r, c, r1, c)
-										# piece here, stop
-										if self.squares[r1][c]:
-											break
-										r1 += dr
-								# same row
-								else:
-									c1 = c + dc
-									while inBounds(c1):
-										addControl(r, c, r, c1)
-										# piece here, stop
-										if self.squares[r][c1]:
-											break
-										c1 += dc
-						case "King":
-							moves = ((1, 1), (-1, -1), (1, 0), (-1, 0),
-									 (0, 1), (0, -1), (1, -1), (-1, 1))  # all legal moves (relative to cur pos)
-							for m in moves:
-								dr, dc = m  # delta row, col
-								if inBounds(r1 := r + dr) and inBounds(c1 := c + dc):
-									addControl(r, c, r1, c1)
-						case _:
-							pass
+					for r1, c1 in self.controlledSquares(r, c):
+						mtx[r1][c1] |= 1 << (r * 8 + c)
+						counts[cur.team][r1][c1] += 1
 		self.control_mtx = mtx
+		self.control_counts = counts
+
+	def removeAllControl(self, r: int, c: int) -> None:
+		'''
+		remove the control of the piece @ r,c from the control matrix
+		'''
+		# (the piece may not control all of these anymore, the board changed since it was added)
+		bit, mtx, counts = 1 << (r * 8 + c), self.control_mtx, self.control_counts[self.squares[r][c].team]
+		for r1, c1 in self.controlledSquares(r, c):
+			if (row := mtx[r1])[c1] & bit:
+				row[c1] ^= bit
+				counts[r1][c1] -= 1
+
+	def addAllControl(self, r: int, c: int) -> None:
+		'''
+		add the control of the piece @ r,c to the control matrix
+		'''
+		bit, mtx, counts = 1 << (r * 8 + c), self.control_mtx, self.control_counts[self.squares[r][c].team]
+		for r1, c1 in self.controlledSquares(r, c):
+			if not (row := mtx[r1])[c1] & bit:
+				row[c1] |= bit
+				counts[r1][c1] += 1
 
 	def updateControlMatrix(self, r: int, c: int, rx: int, cx: int, p1: object, p2: object) -> None:
 		'''
 		update the control matrix for all relevant pieces given the move p1 @ r,c -> p2 @ rx,cx
 		'''
+		# castling also moves a rook, which the square by square update below doesn't handle
+		if (p1.kind == KING) and (abs(cx - c) == 2):
+			self.generateControlMatrix()
+			return
 
-		def inBounds(x: int) -> bool:
-			return x in range(8)
-
-		def removeAllControl(r: int, c: int) -> None:
-
-			def removeControl(r: int, c: int, rx: int, cx: int) -> None:
-				if (r, c) in self.control_mtx[rx][cx]:
-					self.control_mtx[rx][cx].remove((r, c))
-
-			match (cur := self.squares[r][c]).__class__.__name__:
-				case "Pawn":
-					dr = -1 if cur.team else 1  # delta row
-					if inBounds(r1 := r + dr):
-						# capture left
-						if inBounds(c1 := c - 1):
-							removeControl(r, c, r1, c1)
-						# capture right
-						if inBounds(c1 := c + 1):
-							removeControl(r, c, r1, c1)
-				case "Knight":
-					moves = ((1, 2), (1, -2), (-1, 2), (-1, -2),
-							 (2, 1), (2, -1), (-2, 1), (-2, -1))  # all legal moves (relative to cur pos)
-					for m in moves:
-						dr, dc = m  # delta row, col
-						if inBounds(r1 := r + dr) and inBounds(c1 := c + dc):
-							removeControl(r, c, r1, c1)
-				case "Bishop":
-					dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							removeControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "Rook":
-					dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							removeControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "Queen":
-					# diagonal
-					dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							removeControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-					# straight
-					dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							removeControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "King":
-					moves = ((1, 1), (-1, -1), (1, 0), (-1, 0),
-							 (0, 1), (0, -1), (1, -1), (-1, 1))  # all legal moves (relative to cur pos)
-					for m in moves:
-						dr, dc = m  # delta row, col
-						if inBounds(r1 := r + dr) and inBounds(c1 := c + dc):
-							removeControl(r, c, r1, c1)
-				case _:
-					pass
-		
-		def addAllControl(r: int, c: int) -> None:
-
-			def addControl(r: int, c: int, rx: int, cx: int) -> None:
-				if (r, c) not in self.control_mtx[rx][cx]:
-					self.control_mtx[rx][cx].append((r, c))
-
-			match (cur := self.squares[r][c]).__class__.__name__:
-				case "Pawn":
-					dr = -1 if cur.team else 1  # delta row
-					if inBounds(r1 := r + dr):
-						# capture left
-						if inBounds(c1 := c - 1):
-							addControl(r, c, r1, c1)
-						# capture right
-						if inBounds(c1 := c + 1):
-							addControl(r, c, r1, c1)
-				case "Knight":
-					moves = ((1, 2), (1, -2), (-1, 2), (-1, -2),
-							 (2, 1), (2, -1), (-2, 1), (-2, -1))  # all legal moves (relative to cur pos)
-					for m in moves:
-						dr, dc = m  # delta row, col
-						if inBounds(r1 := r + dr) and inBounds(c1 := c + dc):
-							addControl(r, c, r1, c1)
-				case "Bishop":
-					dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							addControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "Rook":
-					dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							addControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "Queen":
-					# diagonal
-					dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							addControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-					# straight
-					dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							addControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "King":
-					moves = ((1, 1), (-1, -1), (1, 0), (-1, 0),
-							 (0, 1), (0, -1), (1, -1), (-1, 1))  # all legal moves (relative to cur pos)
-					for m in moves:
-						dr, dc = m  # delta row, col
-						if inBounds(r1 := r + dr) and inBounds(c1 := c + dc):
-							addControl(r, c, r1, c1)
-				case _:
-					pass
-		
 		'''
 		1) pretend p2 @ rx,cx, remove its control (so not in the way of p1-targeting pieces control)
 		2) pretend p1 @ r,c, remove its control
@@ -466,370 +418,317 @@ class Board:
 		4) add p1 control to rx, cx
 		5) add back control for all affected pieces
 		'''
-		pcs = []  # list of affected pieces
 		# remove p2's control from rx,cx
-		self.squares[rx][cx] = p2
-		removeAllControl(rx, cx)
+		if p2 is not None:
+			self.squares[rx][cx] = p2
+			self.removeAllControl(rx, cx)
 		self.squares[rx][cx] = None
 		# remove p1's control from r,c
 		self.squares[r][c] = p1
-		removeAllControl(r, c)
+		self.removeAllControl(r, c)
 		self.squares[r][c] = None
 		# remove control from all pieces controlling either r,c or rx,cx
-		for p in tuple(self.control_mtx[r][c]):
-			pr, pc = p
-			removeAllControl(pr, pc)
-			pcs.append(p)
-		for p in tuple(self.control_mtx[rx][cx]):
-			pr, pc = p
-			removeAllControl(pr, pc)
-			pcs.append(p)
+		pcs = bitSquares(self.control_mtx[r][c] | self.control_mtx[rx][cx])
+		for pr, pc in pcs:
+			self.removeAllControl(pr, pc)
 		# add control back to all affected pieces
 		# put p1 back on rx,cx
 		self.squares[rx][cx] = p1
-		addAllControl(rx, cx)
-		for p in pcs:
-			pr, pc = p
-			addAllControl(pr, pc)
-
-	def revertControlMatrix(self, r: int, c: int, rx: int, cx: int, p1: object, p2: object) -> None:
-		'''
-		revert the control matrix to before the move p1 @ r,c -> p2 @ rx,cx
-		'''
-
-		def inBounds(x: int) -> bool:
-			return x in range(8)
-
-		def removeAllControl(r: int, c: int) -> None:
-
-			def removeControl(r: int, c: int, rx: int, cx: int) -> None:
-				if (r, c) in self.control_mtx[rx][cx]:
-					self.control_mtx[rx][cx].remove((r, c))
-				
-			match (cur := self.squares[r][c]).__class__.__name__:
-				case "Pawn":
-					dr = -1 if cur.team else 1  # delta row
-					if inBounds(r1 := r + dr):
-						# capture left
-						if inBounds(c1 := c - 1):
-							removeControl(r, c, r1, c1)
-						# capture right
-						if inBounds(c1 := c + 1):
-							removeControl(r, c, r1, c1)
-				case "Knight":
-					moves = ((1, 2), (1, -2), (-1, 2), (-1, -2),
-							 (2, 1), (2, -1), (-2, 1), (-2, -1))  # all legal moves (relative to cur pos)
-					for m in moves:
-						dr, dc = m  # delta row, col
-						if inBounds(r1 := r + dr) and inBounds(c1 := c + dc):
-							removeControl(r, c, r1, c1)
-				case "Bishop":
-					dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							removeControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "Rook":
-					dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							removeControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "Queen":
-					# diagonal
-					dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							removeControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-					# straight
-					dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							removeControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "King":
-					moves = ((1, 1), (-1, -1), (1, 0), (-1, 0),
-							 (0, 1), (0, -1), (1, -1), (-1, 1))  # all legal moves (relative to cur pos)
-					for m in moves:
-						dr, dc = m  # delta row, col
-						if inBounds(r1 := r + dr) and inBounds(c1 := c + dc):
-							removeControl(r, c, r1, c1)
-				case _:
-					pass
-		
-		def addAllControl(r: int, c: int) -> None:
-
-			def addControl(r: int, c: int, rx: int, cx: int) -> None:
-				if (r, c) not in self.control_mtx[rx][cx]:
-					self.control_mtx[rx][cx].append((r, c))
-
-			match (cur := self.squares[r][c]).__class__.__name__:
-				case "Pawn":
-					dr = -1 if cur.team else 1  # delta row
-					if inBounds(r1 := r + dr):
-						# capture left
-						if inBounds(c1 := c - 1):
-							addControl(r, c, r1, c1)
-						# capture right
-						if inBounds(c1 := c + 1):
-							addControl(r, c, r1, c1)
-				case "Knight":
-					moves = ((1, 2), (1, -2), (-1, 2), (-1, -2),
-							 (2, 1), (2, -1), (-2, 1), (-2, -1))  # all legal moves (relative to cur pos)
-					for m in moves:
-						dr, dc = m  # delta row, col
-						if inBounds(r1 := r + dr) and inBounds(c1 := c + dc):
-							addControl(r, c, r1, c1)
-				case "Bishop":
-					dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							addControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "Rook":
-					dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							addControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "Queen":
-					# diagonal
-					dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							addControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-					# straight
-					dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-					for d in dirs:
-						dr, dc = d  # delta row, col
-						r1, c1 = r + dr, c + dc
-						while inBounds(r1) and inBounds(c1):
-							addControl(r, c, r1, c1)
-							# piece here, stop
-							if self.squares[r1][c1]:
-								break
-							r1 += dr
-							c1 += dc
-				case "King":
-					moves = ((1, 1), (-1, -1), (1, 0), (-1, 0),
-							 (0, 1), (0, -1), (1, -1), (-1, 1))  # all legal moves (relative to cur pos)
-					for m in moves:
-						dr, dc = m  # delta row, col
-						if inBounds(r1 := r + dr) and inBounds(c1 := c + dc):
-							addControl(r, c, r1, c1)
-				case _:
-					pass
-
-		'''
-		(just after undo move, so p1 is @r,c and p2 @ rx,cx)
-		1) remove p2, pretend p1 @ rx,cx, remove control
-		2) remove control from all targeting r,c and rx,cx
-		3) add control back to r,c (p1 already there)
-		4) add control back to pcs
-		'''	
-		pcs = []  # list of affected pieces
-		# remove p2 from r,c
-		self.squares[r][c] = None
-		# remove p1's control from rx,cx
-		self.squares[rx][cx] = p1
-		removeAllControl(rx, cx)
-		self.squares[rx][cx] = None
-		# remove control from all pieces targeting r,c or rx,cx
-		for p in tuple(self.control_mtx[r][c]):
-			pr, pc = p
-			removeAllControl(pr, pc)
-			pcs.append(p)
-		for p in tuple(self.control_mtx[rx][cx]):
-			pr, pc = p
-			removeAllControl(pr, pc)
-			pcs.append(p)
-		# add control back to all affected pieces
-		# put p1, p2 back
-		self.squares[r][c] = p1
-		self.squares[rx][cx] = p2
-		addAllControl(r, c)
-		addAllControl(rx, cx)
-		for p in pcs:
-			pr, pc = p
-			addAllControl(pr, pc)
+		self.addAllControl(rx, cx)
+		for pr, pc in pcs:
+			self.addAllControl(pr, pc)
 
 	def generateLegalMoves(self, team: bool) -> None:
 		'''
 		generate matrix that contains all legal moves for given team with cur pos
 		'''
 
-		def inBounds(x: int) -> bool:
-			return x in range(8)
-
-		def addMove(r: int, c: int, rx: int, cx: int) -> None:
-			# if (rx, cx) no t in mtx[r][c]:
-			legal.append((r, c, rx, cx))
-
 		def inCheckAfter(r: int, c: int, rx: int, cx: int) -> bool:
-			# store relevant info before trying move
-			p1, p2 = self.squares[r][c], self.squares[rx][cx]
-			p1_moved = p1.moved if hasattr(p1, "moved") else None
-			# try move
-			self.move(r, c, rx, cx)
-			self.updateControlMatrix(r, c, rx, cx, p1, p2)
-			self.generatePositionMatrix()
+			# try move (a promoting pawn can stay a pawn, it doesn't change the check)
+			self.push((r, c, rx, cx), None)
 			check = self.check(team)  # in check after move?
-			# undo move
-			self.undo(r, c, rx, cx, p1, p2, p1_moved)
-			self.revertControlMatrix(r, c, rx, cx, p1, p2)
-			self.generatePositionMatrix()
+			self.pop()
 			return check
 
-		legal = []
+		self.generatePseudoLegalMoves(team)
+		self.legal_moves = [m for m in self.pseudo_moves if not inCheckAfter(*m)]
+
+	def generatePseudoLegalMoves(self, team: bool) -> None:
+		'''
+		generate list that contains all moves for given team with cur pos, without checking if
+		they leave the king in check (isLegal checks that per move, using self.legality)
+		'''
+		pseudo = []
+		enemy = not team
+		home = 6 if team else 1  # pawn home row
+		rights = self.castling & ((WHITE_SHORT | WHITE_LONG) if team else (BLACK_SHORT | BLACK_LONG))
 		for r in range(8):
 			for c in range(8):
 				if (cur := self.squares[r][c]) and (cur.team == team):
-					match cur.__class__.__name__:
-						case "Pawn":
-							dr = -1 if cur.team else 1  # delta row
-							if inBounds(r1 := r + dr):
-								# push 1
-								if (not self.squares[r1][c]) and (not inCheckAfter(r, c, r1, c)):
-									addMove(r, c, r1, c)
-									# push 2 (first push only)
-									if inBounds(r2 := r1 + dr) and (not cur.moved) and \
-										(not self.squares[r2][c]) and (not inCheckAfter(r, c, r2, c)):
-										addMove(r, c, r2, c)
-								# capture left
-								if inBounds(c1 := c - 1) and (self.pos_mtx[r1][c1] == (not team)) \
-									and (not inCheckAfter(r, c, r1, c1)):
-									addMove(r, c, r1, c1)
-								# capture right
-								if inBounds(c1 := c + 1) and (self.pos_mtx[r1][c1] == (not team)) \
-									and (not inCheckAfter(r, c, r1, c1)):
-									addMove(r, c, r1, c1)
-						case "Knight":
-							moves = ((1, 2), (1, -2), (-1, 2), (-1, -2),
-									 (2, 1), (2, -1), (-2, 1), (-2, -1))  # all legal moves (relative to cur pos)
-							for m in moves:
-								dr, dc = m  # delta row, col
-								if inBounds(r1 := r + dr) and inBounds(c1 := c + dc) and \
-									(self.pos_mtx[r1][c1] != team) and (not inCheckAfter(r, c, r1, c1)):
-									addMove(r, c, r1, c1)
-						case "Bishop":
-							dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-							for d in dirs:
-								dr, dc = d  # delta row, col
-								r1, c1 = r + dr, c + dc
-								while inBounds(r1) and inBounds(c1) and (self.pos_mtx[r1][c1] != team) \
-									and (not inCheckAfter(r, c, r1, c1)):
-									addMove(r, c, r1, c1)
-									# piece here, stop
-									if self.squares[r1][c1]:
-										break
-									r1 += dr
-									c1 += dc
-						case "Rook":
-							dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-							for d in dirs:
-								dr, dc = d  # delta row, col
-								r1, c1 = r + dr, c + dc
-								while inBounds(r1) and inBounds(c1) and (self.pos_mtx[r1][c1] != team) \
-									and (not inCheckAfter(r, c, r1, c1)):
-									addMove(r, c, r1, c1)
-									# piece here, stop
-									if self.squares[r1][c1]:
+					match (kind := cur.kind):
+						case Pawn.kind:
+							r1 = r + (-1 if team else 1)
+							# push 1
+							if (0 <= r1 < 8) and (not self.squares[r1][c]):
+								pseudo.append((r, c, r1, c))
+								# push 2 (from the pawn's home row only)
+								if (r == home) and (not self.squares[r2 := r1 + r1 - r][c]):
+									pseudo.append((r, c, r2, c))
+							# captures
+							for r1, c1 in PAWN_ATTACKS[team][r][c]:
+								if self.pos_mtx[r1][c1] == enemy:
+									pseudo.append((r, c, r1, c1))
+						case Knight.kind | King.kind:
+							for r1, c1 in (KNIGHT_TARGETS if kind == KNIGHT else KING_TARGETS)[r][c]:
+								if self.pos_mtx[r1][c1] != team:
+									pseudo.append((r, c, r1, c1))
+						case Bishop.kind | Rook.kind | Queen.kind:
+							for rays in SLIDER_RAYS[kind][r][c]:
+								for r1, c1 in rays:
+									if (side := self.pos_mtx[r1][c1]) == team:
 										break
-									r1 += dr
-									c1 += dc
-						case "Queen":
-							# diagonals
-							dirs = ((1, 1), (1, -1), (-1, 1), (-1, -1))  # all directions (relative)
-							for d in dirs:
-								dr, dc = d  # delta row, col
-								r1, c1 = r + dr, c + dc
-								while inBounds(r1) and inBounds(c1) and (self.pos_mtx[r1][c1] != team) \
-									and (not inCheckAfter(r, c, r1, c1)):
-									addMove(r, c, r1, c1)
+									pseudo.append((r, c, r1, c1))
 									# piece here, stop
-									if self.squares[r1][c1]:
+									if side is not None:
 										break
-									r1 += dr
-									c1 += dc
-							# straights
-							dirs = ((1, 0), (0, 1), (-1, 0), (0, -1))  # all directions (relative)
-							for d in dirs:
-								dr, dc = d  # delta row, col
-								r1, c1 = r + dr, c + dc
-								while inBounds(r1) and inBounds(c1) and (self.pos_mtx[r1][c1] != team) \
-									and (not inCheckAfter(r, c, r1, c1)):
-									addMove(r, c, r1, c1)
-									# piece here, stop
-									if self.squares[r1][c1]:
+						case _:
+							pass
+					# castle (a right held means the king and rook are still on their home squares)
+					if (kind == KING) and rights:
+						# short
+						if (rights & (WHITE_SHORT | BLACK_SHORT)) and (self.squares[r][5] == self.squares[r][6] == None):
+							pseudo.append((r, 4, r, 6))
+						# long
+						if (rights & (WHITE_LONG | BLACK_LONG)) \
+							and (self.squares[r][1] == self.squares[r][2] == self.squares[r][3] == None):
+								pseudo.append((r, 4, r, 2))
+		self.pseudo_moves = pseudo
+		self.legality = self.legalityInfo(team)
+
+	def generateCaptures(self, team: bool) -> None:
+		'''
+		generate list that contains the legal captures and promotions for given team with cur pos
+		(for quiescence search, without generating the quiet moves)
+		'''
+		captures = []
+		enemy = not team
+		for r in range(8):
+			for c in range(8):
+				if (cur := self.squares[r][c]) and (cur.team == team):
+					match (kind := cur.kind):
+						case Pawn.kind:
+							r1 = r + (-1 if cur.team else 1)
+							# promote
+							if (r1 in (0, 7)) and (not self.squares[r1][c]):
+								captures.append((r, c, r1, c))
+							for r1, c1 in PAWN_ATTACKS[team][r][c]:
+								if self.pos_mtx[r1][c1] == enemy:
+									captures.append((r, c, r1, c1))
+						case Knight.kind | King.kind:
+							for r1, c1 in (KNIGHT_TARGETS if kind == KNIGHT else KING_TARGETS)[r][c]:
+								if self.pos_mtx[r1][c1] == enemy:
+									captures.append((r, c, r1, c1))
+						case Bishop.kind | Rook.kind | Queen.kind:
+							for rays in SLIDER_RAYS[kind][r][c]:
+								# slide to the first piece
+								for r1, c1 in rays:
+									if (side := self.pos_mtx[r1][c1]) is not None:
+										if side == enemy:
+											captures.append((r, c, r1, c1))
 										break
-									r1 += dr
-									c1 += dc
-						case "King":
-							moves = ((1, 1), (-1, -1), (1, 0), (-1, 0),
-									 (0, 1), (0, -1), (1, -1), (-1, 1))  # all legal moves (relative to cur pos)
-							for m in moves:
-								dr, dc = m  # delta row, col
-								if inBounds(r1 := r + dr) and inBounds(c1 := c + dc) and \
-									(self.pos_mtx[r1][c1] != team) and (not inCheckAfter(r, c, r1, c1)):
-									addMove(r, c, r1, c1)
-							# castle
-							if (not cur.moved):
-								# short
-								if ((rook := self.squares[r][7]) != None) and (rook.__class__.__name__ == "Rook") and (not rook.moved) \
-									and (self.squares[r][5] == self.squares[r][6] == None) and (not inCheckAfter(r, 4, r, 6)):
-										addMove(r, 4, r, 6)
-								# long
-								if ((rook := self.squares[r][0]) != None) and (rook.__class__.__name__ == "Rook") and (not rook.moved) \
-									and (self.squares[r][1] == self.squares[r][2] == self.squares[r][3] == None) \
-										and (not inCheckAfter(r, 4, r, 2)):
-										addMove(r, 4, r, 2)
 						case _:
 							pass
-		self.legal_moves = legal
+		legality = self.legalityInfo(team)
+		self.capture_moves = [m for m in captures if self.isLegal(*m, legality)]
+
+	def legalityInfo(self, team: bool) -> tuple:
+		'''
+		pin and check info for the given team's king: (team, king pos, pins, evasions)
+
+		pins maps a pinned piece's pos to the line it can still move along (the whole line through the
+		king, its moves can't pass the king or the pinner anyway), evasions
+		is None when not in check, else the squares a non-king move must land on (capture the
+		checker or block it, none if in double check)
+		'''
+		kr, kc = self.white_king_pos if team else self.black_king_pos
+		between, lines = BETWEEN[kr * 8 + kc], LINE[kr * 8 + kc]
+		pins, evasions, checkers = {}, None, 0
+		# sliders
+		for sliders, rays in zip(RAY_SLIDERS, RAYS[kr][kc]):
+			own = None
+			for r1, c1 in rays:
+				if cur := self.squares[r1][c1]:
+					if cur.team == team:
+						# second own piece, nothing pinned or checking along this line
+						if own:
+							break
+						own = (r1, c1)
+					else:
+						if cur.kind in sliders:
+							if own:
+								pins[own] = lines[r1 * 8 + c1]
+							else:
+								checkers += 1
+								evasions = between[r1 * 8 + c1] | {(r1, c1)}
+						break
+		# knights and pawns (can only be captured)
+		for squares, kind in ((KNIGHT_TARGETS[kr][kc], KNIGHT), (PAWN_ATTACKS[team][kr][kc], PAWN)):
+			for r1, c1 in squares:
+				if (cur := self.squares[r1][c1]) and (cur.team != team) and (cur.kind == kind):
+					checkers += 1
+					evasions = {(r1, c1)}
+		if checkers > 1:
+			evasions = set()
+		return team, (kr, kc), pins, evasions
+
+	def isLegal(self, r: int, c: int, rx: int, cx: int, legality: tuple = None) -> bool:
+		'''
+		if the pseudo-legal move r,c -> rx,cx doesn't leave the mover's king in check
+
+		legality is the info from generatePseudoLegalMoves for the position the move was generated
+		in (defaults to the last one generated)
+		'''
+		team, king, pins, evasions = legality or self.legality
+		if (r, c) == king:
+			# castle, try it (only the position after castling must be safe)
+			if abs(cx - c) == 2:
+				self.move(r, c, rx, cx)
+				safe = not self.attacked(rx, cx, not team)
+				self.undo()
+				return safe
+			return not self.attacked(rx, cx, not team, (r, c))
+		if (evasions is not None) and ((rx, cx) not in evasions):
+			return False
+		return ((r, c) not in pins) or ((rx, cx) in pins[(r, c)])
+
+	def attacked(self, r: int, c: int, team: bool, ignore: tuple = None) -> bool:
+		'''
+		if square r,c is attacked by the given team, looking straight from the square instead of
+		at the control matrix (ignore is treated as empty, e.g. the king that is moving away)
+		'''
+		# knights
+		for r1, c1 in KNIGHT_TARGETS[r][c]:
+			if (cur := self.squares[r1][c1]) and (cur.team == team) and (cur.kind == KNIGHT):
+				return True
+		# pawns (the squares a pawn of the other team on r,c would attack)
+		for r1, c1 in PAWN_ATTACKS[not team][r][c]:
+			if (cur := self.squares[r1][c1]) and (cur.team == team) and (cur.kind == PAWN):
+				return True
+		# kings and sliders
+		for sliders, rays in zip(RAY_SLIDERS, RAYS[r][c]):
+			for i, (r1, c1) in enumerate(rays):
+				if (cur := self.squares[r1][c1]) and ((r1, c1) != ignore):
+					if (cur.team == team) and ((cur.kind in sliders) or ((cur.kind == KING) and (i == 0))):
+						return True
+					break
+		return False
+
+	def makeNullMove(self) -> None:
+		'''
+		pass the turn without moving (for null-move pruning), only the side to move in the zobrist
+		key changes
+		'''
+		self.zobrist ^= BLACK_TO_MOVE
+
+	def undoNullMove(self) -> None:
+		'''
+		undo makeNullMove
+		'''
+		self.zobrist ^= BLACK_TO_MOVE
+
+	def capturedBack(self, r: int, c: int, rx: int, cx: int) -> bool:
+		'''
+		if the piece moving r,c -> rx,cx could be taken on rx,cx by the other team
+		'''
+		return self.attacked(rx, cx, not self.squares[r][c].team, (r, c))
+
+	def hasLegalMove(self, legality: tuple = None) -> bool:
+		'''
+		if any of the generated pseudo-legal moves is legal (stops at the first one)
+		'''
+		return any(self.isLegal(*m, legality) for m in self.pseudo_moves)
+
+	def pack(self, team: bool = True, move_count: int = 0) -> bytes:
+		'''
+		fixed size (PACKED_SIZE) copy of the position: 32 bytes of 4-bit piece codes (2 squares per
+		byte), the castling rights with the side to move in bit 4, the halfmove clock (capped at 255)
+		and move_count as 2 big-endian bytes
+		'''
+		codes = [0 if cur is None else (cur.kind + 1) | (0 if cur.team else 8) for row in self.squares for cur in row]
+		return bytes([(codes[i] << 4) | codes[i + 1] for i in range(0, 64, 2)]
+			+ [self.castling | (0 if team else 16), min(self.halfmove_clock, 255)]) + move_count.to_bytes(2, 'big')
+
+	def unpack(self, data: bytes) -> tuple[bool, int]:
+		'''
+		set up the position from pack(), returns the side to move and move_count
+		'''
+		codes = [(data[i // 2] >> (0 if i % 2 else 4)) & 15 for i in range(64)]
+		team = not data[32] & 16
+		self.placePieces(codes, data[32] & 15, team)
+		self.halfmove_clock = data[33]
+		return team, int.from_bytes(data[34:36], 'big')
+
+	def placePieces(self, codes: list, rights: int, team: bool) -> None:
+		'''
+		set up the squares from 64 piece codes (piece kind + 1, 8 set for black) with team to move and
+		the given castling rights (those without their king and rook at home are dropped)
+		'''
+		self.squares = [[None for _ in range(8)] for _ in range(8)]
+		for i, code in enumerate(codes):
+			if code:
+				self.squares[i // 8][i % 8] = PIECES[(code & 7) - 1](not code & 8)
+		self.initState(team, rights)
+
+	def loadFen(self, fen: str) -> tuple[bool, int]:
+		'''
+		set up the position from a FEN string, returns the side to move and the move count (plies
+		since the start). en passant targets are ignored (this game has no en passant) and missing
+		counters default to 0 1
+		'''
+		fields = fen.split()
+		placement, side, castling = fields[:3]
+		halfmove = int(fields[4]) if len(fields) > 4 else 0
+		fullmove = int(fields[5]) if len(fields) > 5 else 1
+		codes = []
+		for rank in placement.split('/'):
+			for char in rank:
+				if char.isdigit():
+					codes += [0] * int(char)
+				elif char.upper() in FEN_LETTERS[1:]:
+					codes.append(FEN_LETTERS.index(char.upper()) | (0 if char.isupper() else 8))
+				else:
+					raise ValueError(f"bad FEN piece placement: {placement}")
+		if len(codes) != 64 or side not in ('w', 'b'):
+			raise ValueError(f"bad FEN: {fen}")
+		# the board can't hold a position without exactly one king per team or with a pawn on the first
+		# or last rank (the king positions and pawn moves rely on both)
+		if (codes.count(KING + 1) != 1) or (codes.count((KING + 1) | 8) != 1):
+			raise ValueError(f"bad FEN, each side needs exactly one king: {fen}")
+		if any((code & 7) == PAWN + 1 for code in codes[:8] + codes[56:]):
+			raise ValueError(f"bad FEN, pawn on the first or last rank: {fen}")
+		team = side == 'w'
+		rights = sum(flag for letter, flag in CASTLING_LETTERS if letter in castling)
+		self.placePieces(codes, rights, team)
+		self.halfmove_clock = halfmove
+		return team, 2 * (fullmove - 1) + (0 if team else 1)
+
+	def toFen(self, team: bool = True, move_count: int = 0) -> str:
+		'''
+		FEN string of the position with team to move, move_count plies since the start
+		'''
+		ranks = []
+		for row in self.squares:
+			rank, empty = '', 0
+			for cur in row:
+				if cur is None:
+					empty += 1
+					continue
+				letter = FEN_LETTERS[cur.kind + 1]
+				rank += (str(empty) if empty else '') + (letter if cur.team else letter.lower())
+				empty = 0
+			ranks.append(rank + (str(empty) if empty else ''))
+		castling = ''.join(letter for letter, flag in CASTLING_LETTERS if self.castling & flag) or '-'
+		return f"{'/'.join(ranks)} {'w' if team else 'b'} {castling} - {self.halfmove_clock} {move_count // 2 + 1}"
 
 	def printBoard(self) -> None:
 		print("    0  1  2  3  4  5  6  7")
@@ -839,21 +738,9 @@ class Board:
 			for c in range(8):
 				cur = self.squares[r][c]
 				if cur:
-					match cur.__class__.__name__:
-						case "Pawn":
-							print(" p " if cur.team else " P ", end="")
-						case "Knight":
-							print(" n " if cur.team else " N ", end="")
-						case "Bishop":
-							print(" b " if cur.team else " B ", end="")
-						case "Rook":
-							print(" r " if cur.team else " R ", end="")
-						case "Queen":
-							print(" q " if cur.team else " Q ", end="")
-						case "King":
-							print(" k " if cur.team else " K ", end="")
-						case _:
-							pass
+					# white pieces are shown in lower case
+					letter = FEN_LETTERS[cur.kind + 1]
+					print(f" {letter.lower() if cur.team else letter} ", end="")
 				else:
 					print(" ∙ ", end="") # ∙□.-
 			print("|")
@@ -878,9 +765,94 @@ class Board:
 		for r in range(8):
 			print(f"row {r}: ", end="")
 			for c in range(8):
-				print(self.control_mtx[r][c], end=" _ ")
+				print(bitSquares(self.control_mtx[r][c]), end=" _ ")
 			print("\n")
 
 	def printLegalMoves(self) -> None:
 		print("*********\nLEGAL MOVES:\n\n")
 		print(self.legal_moves)
+
+class LazyBoard(Board):
+	'''
+	Board that builds the control matrix only when something reads it (Engine.controlEvaluate at a
+	leaf) instead of keeping it up to date on every push / pop, check and legal moves are tested with
+	attacks straight from the king square
+
+	a node's control matrix is kept on the undo stack while its children are searched, so it is
+	built at most once per node
+	'''
+
+	@property
+	def control_mtx(self) -> list:
+		'''
+		matrix that contains info about what pieces control what squares (both teams), built on first
+		use after each move
+		'''
+		if self.control is None:
+			self.generateControlMatrix()
+		return self.control
+
+	@property
+	def control_counts(self) -> list:
+		'''
+		per team, matrix of how many of its pieces control each square (from control_mtx, only
+		needed to check the board, check() doesn't use it)
+		'''
+		occupied = [0, 0]
+		for r in range(8):
+			for c in range(8):
+				if cur := self.squares[r][c]:
+					occupied[cur.team] |= 1 << (r * 8 + c)
+		return [[[(mask & occupied[team]).bit_count() for mask in row] for row in self.control_mtx] for team in (0, 1)]
+
+	def generateControlMatrix(self) -> None:
+		'''
+		generate matrix that contains info about all squares under control/attack (both teams)
+		'''
+		mtx = [[0 for _ in range(8)] for _ in range(8)]
+		for r in range(8):
+			for c in range(8):
+				if self.squares[r][c]:
+					bit = 1 << (r * 8 + c)
+					for r1, c1 in self.controlledSquares(r, c):
+						mtx[r1][c1] |= bit
+		self.control = mtx
+
+	# the control matrix is rebuilt when read, nothing to keep up to date
+	def updateControlMatrix(self, *args) -> None:
+		pass
+
+	def removeAllControl(self, r: int, c: int) -> None:
+		pass
+
+	def addAllControl(self, r: int, c: int) -> None:
+		pass
+
+	def push(self, move: tuple, promotion: type = Queen) -> None:
+		r, c, rx, cx = move
+		kind = self.squares[r][c].kind
+		self.move(r, c, rx, cx)
+		# keep this node's control matrix (if it was built) for pop
+		self.history[-1][12], self.control = self.control, None
+		if (kind == PAWN) and (rx in (0, 7)) and (promotion is not None):
+			self.promote(rx, cx, promotion)
+
+	def pop(self) -> None:
+		control = self.history[-1][12]
+		self.undo()
+		self.control = control
+
+	def check(self, team: bool) -> bool:
+		'''
+		if the given team is currently in check
+		'''
+		r, c = self.white_king_pos if team else self.black_king_pos
+		return self.attacked(r, c, not team)
+
+	def generateLegalMoves(self, team: bool) -> None:
+		'''
+		generate list that contains all legal moves for given team with cur pos (pseudo-legal moves
+		that pass isLegal, without playing them)
+		'''
+		self.generatePseudoLegalMoves(team)
+		self.legal_moves = [m for m in self.pseudo_moves if self.isLegal(*m)]
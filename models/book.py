@@ -0,0 +1,71 @@
+"""
+Opening book: a file of (zobrist key, move, weight) records sorted by key,
+memory-mapped and binary searched, so the bot can play known opening moves
+without searching and a big book costs nothing to open. Books are built by
+buildbook.py.
+"""
+
+import mmap
+import os
+import random
+import struct
+from models.transposition import decodeMove
+
+class OpeningBook:
+    """
+    Read-only view of a book file. Records are big-endian (key, move, weight),
+    with the move packed by encodeMove, sorted by key then move.
+    """
+    RECORD = struct.Struct('>QHH')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        # An empty file can't be mapped (and has nothing to look up).
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.size = size // self.RECORD.size # Records.
+
+    def __len__(self) -> int:
+        return self.size
+
+    def key(self, index: int) -> int:
+        return struct.unpack_from('>Q', self.data, index * self.RECORD.size)[0]
+
+    def entries(self, key: int) -> list[tuple[tuple[int], int]]:
+        """
+        (move, weight) of every record for a position.
+        """
+        low, high = 0, self.size
+
+        # First record with a key >= key.
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key: low = middle + 1
+            else: high = middle
+
+        entries = []
+
+        while low < self.size and self.key(low) == key:
+            _, move, weight = self.RECORD.unpack_from(self.data, low * self.RECORD.size)
+            entries.append((decodeMove(move), weight))
+            low += 1
+
+        return entries
+
+    def choose(self, key: int, rng: random.Random = random) -> tuple[int] | None:
+        """
+        A book move for a position, picked at random in proportion to the
+        weights (None if the position isn't in the book).
+        """
+        entries = [(move, weight) for move, weight in self.entries(key) if weight > 0]
+
+        if not entries:
+            return None
+
+        return rng.choices([move for move, _ in entries], [weight for _, weight in entries])[0]
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
@@ -1,111 +1,750 @@
 from .engine import Engine
 from .board import Board
+from .ordering import MoveOrderer, QUIET
+from .stats import SearchStats
+from .transposition import TranspositionTable, EXACT, LOWER, UPPER
+from .book import OpeningBook
+from .pieces import PAWN
+from .scores import POSITION_VALUES
+from concurrent.futures import ProcessPoolExecutor, wait
 import math
+import multiprocessing
 import random
-from typing import Type, Tuple
+import threading
+import time
+from typing import Callable, Type
+
+MAX_DEPTH = 64 # Deepest iteration when searching against the clock.
+# Quiescence skips captures that can't reach the window even when winning the
+# captured piece plus this many pawns.
+DELTA_MARGIN = 2
+# With quiescence_checks, quiet moves that give check are searched in this many
+# quiescence plies (they cost a make and unmake each to find).
+QUIESCENCE_CHECK_PLIES = 1
+# Width of a zero window, below the smallest difference between two evaluations.
+NULL_WINDOW = 0.01
+NULL_MOVE_REDUCTION = 2 # Extra depth taken off the null move search (down to depth 0).
+# Late move reductions: reduce quiet moves after the first LMR_MOVES by one ply at
+# depth LMR_DEPTH and above.
+LMR_MOVES = 3
+LMR_DEPTH = 3
+# Aspiration windows start this many pawns either side of the last score and
+# widen ASPIRATION_GROWTH times on every fail, up to ASPIRATION_LIMIT pawns (then
+# infinite). Pawns are converted to scores with the engine's material weight.
+ASPIRATION_WINDOW = 0.5
+ASPIRATION_GROWTH = 4
+ASPIRATION_LIMIT = 8
+# While waiting for the worker processes, look for a stop this often (seconds).
+STOP_POLL = 0.02
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time limit runs out.
+    """
 
 class Bot:
-    def __init__(self, depth: int, engine: Type[Engine]):
+    def __init__(self, depth: int, engine: Type[Engine], table_size: int = 16, time_limit: int | None = None,
+                 lazy_legality: bool = False, node_hook: Callable | None = None, workers: int = 0,
+                 move_ordering: bool = True, quiescence: bool = True, quiescence_checks: bool = False,
+                 pvs: bool = False, null_move: bool = False, late_move_reductions: bool = False,
+                 aspiration: bool = False, pondering: bool = False, book: str | None = None):
         self.depth = depth
         self.engine = engine
-        self.cache = {} # Board memoization.
+        self.table = TranspositionTable(table_size) # Board memoization (size in MB).
+        self.time_limit = time_limit # Milliseconds per move, None searches to self.depth.
+        self.deadline = None
+        self.pv = [] # Principal variation of the last completed iteration.
+        self.pv_moves = {} # Zobrist key -> PV move, tried first at those positions.
+        # Generate pseudo-legal moves and only check the ones the search tries.
+        self.lazy_legality = lazy_legality
+        self.stats = SearchStats() # Counters for the last calculateBestMove call.
+        # Called as node_hook(board, team, depth, a, b) at every node searched (for
+        # tracing or profiling, it slows the search down).
+        self.node_hook = node_hook
+        # Search the root moves in this many processes (0 searches them here). Each
+        # worker has its own transposition table of table_size MB.
+        self.workers = workers
+        self.pool = None
+        # Shared with the worker processes, set to stop their searches (see
+        # searchRootParallel).
+        self.stop_event = None
+        self.search_id = 0 # Counts searches, so workers know when a new one starts.
+        # Order interior moves by hash move, MVV-LVA, killers and history (otherwise
+        # only the hash move goes first).
+        self.move_ordering = move_ordering
+        self.orderer = MoveOrderer()
+        # Search captures past depth 0 until the position is quiet (and with
+        # quiescence_checks, quiet checks in its first plies and all replies to a
+        # check instead of standing pat).
+        self.quiescence = quiescence
+        self.quiescence_checks = quiescence_checks
+        # Enhanced search (off by default, to compare with plain alpha-beta):
+        # * pvs: search moves after the first with a zero window and only search
+        #   them again with the full window if they turn out better.
+        # * null_move: let the side to move pass, if a reduced search still fails
+        #   high the position is good enough to cut off.
+        # * late_move_reductions: search quiet moves late in the ordering one ply
+        #   shallower, and again at full depth if they turn out better.
+        self.pvs = pvs
+        self.null_move = null_move
+        self.late_move_reductions = late_move_reductions
+        # Search the root with a narrow window around the last score (widened when
+        # the score falls outside it) instead of an infinite one.
+        self.aspiration = aspiration
+        self.score = None # Score of the last completed iteration (kept between moves).
+        self.root_move_count = 0 # Move count at the root, for the ply of a node.
+        # Search the predicted reply while the other player thinks (see ponder).
+        self.pondering = pondering
+        self.ponder_thread = None
+        self.ponder_key = None # (zobrist key, team, move count) of the pondered position.
+        self.ponder_start = None # When the ponder search started (perf_counter).
+        self.ponder_result = None # Best move found by the finished ponder search.
+        # Principal variation of the ponder search, kept apart from pv (which the
+        # caller may still be reading) until it's a hit.
+        self.ponder_pv = []
+        self.stopped = False # Set to abort the search in progress.
+        # Opening book file (see book.py), consulted before searching.
+        self.book = None if book is None else OpeningBook(book)
 
-    def calculateBestMove(self, board: Type[Board], team: bool, move_count: int) -> tuple[int]:
+    def calculateBestMove(self, board: Type[Board], team: bool, move_count: int,
+                          time_limit: int | None = None, return_stats: bool = False) -> tuple:
         """
-        Calculate the best move (according to the engine) given a board.
+        Calculate the best move (according to the engine) given a board and play
+        it. If this position was being pondered, take over that search instead,
+        and if it's in the opening book, play a book move without searching.
+        Returns the move played, or (move, stats) with return_stats (the stats of
+        the last call are also kept in self.stats).
         """
-        scores = []
+        time_limit = self.time_limit if time_limit is None else time_limit
+        best_move = None
+
+        if self.ponder_thread is not None:
+            hit = self.ponder_key == (board.zobrist, team, move_count)
+
+            # Ponder hit: let the search finish, with the time limit counted from when
+            # the ponder search started (so the time it already used is saved).
+            if hit and time_limit is not None:
+                self.deadline = max(self.ponder_start + time_limit / 1000, time.perf_counter())
+
+            # Ponder miss: stop it (what it stored in the table stays).
+            elif not hit:
+                self.stopped = True
+
+            self.ponder_thread.join()
+            self.ponder_thread, self.stopped = None, False
+
+            if hit:
+                best_move, self.pv = self.ponder_result, self.ponder_pv
+                self.stats.ponder_hit = True
+
+        if best_move is None and (best_move := self.bookMove(board)) is not None:
+            self.stats = SearchStats()
+            self.stats.book_move = True
+            self.pv = []
+
+        if best_move is None:
+            best_move = self.search(board, team, move_count, time_limit)
+
+        board.makeBotMove(*best_move)
+
+        return (best_move, self.stats) if return_stats else best_move
+
+    def search(self, board: Type[Board], team: bool, move_count: int, time_limit: int | None,
+               ponder: bool = False) -> tuple[int]:
+        """
+        Find the best move for team (from board.legal_moves) without playing it.
+        * With iterative deepening: search to depth 0, 1, 2, ... so that every
+          iteration can order its moves using the last one's results.
+        * With a time limit (ms), keep deepening until the time runs out and
+          return the best move of the last completed iteration.
+        * With aspiration windows, see searchIteration.
+        * When pondering, the time limit only starts once the position is
+          reached (calculateBestMove sets the deadline), until then keep going.
+          The principal variation goes to ponder_pv instead of pv.
+        """
+        start = time.perf_counter()
+
+        if not ponder:
+            self.deadline = None if time_limit is None else start + time_limit / 1000
+            self.pv = []
+        self.pv_moves = {}
+        self.table.newSearch()
+        self.orderer.newSearch()
+        self.search_id += 1
+        self.root_move_count = move_count
+        self.stats = stats = SearchStats()
+        stats.nodes += 1 # The root.
+
         moves = board.legal_moves
 
         # Sort the moves so that good moves appear first to maximize the potential
         # for pruning.
-        # In detail: sort first by pieces with a low position score and second 
-        # by pieces with a high value in descending order.
-        moves.sort(key=lambda m:self.engine.position_scores[board.squares[m[0]][m[1]].__class__.__name__] \
-                   [((m[0] * 8) + m[1]) if board.squares[m[0]][m[1]].team else ((7 - m[0]) * 8 + m[1])] \
-                    * -board.squares[m[0]][m[1]].value, reverse=True)
-        
-        for r, c, rx, cx in moves:
-            piece1, piece2 = board.squares[r][c], board.squares[rx][cx]
-            piece1_moved = piece1.moved if hasattr(piece1, "moved") else None
+        # In detail: by the moving piece's position score times its value (from its
+        # own team's side), lowest first.
+        moves.sort(key=lambda m:POSITION_VALUES[board.squares[m[0]][m[1]].kind][team][m[0] * 8 + m[1]],
+                   reverse=not team)
+        best_move = None
+
+        for depth in range(self.depth + 1 if time_limit is None else MAX_DEPTH):
+            iteration_start, iteration_nodes = time.perf_counter(), stats.nodes
+
+            try:
+                scores = self.searchIteration(board, team, move_count, depth, moves)
+            except SearchTimeout:
+                break
+
+            stats.completeIteration(depth + 1, time.perf_counter() - iteration_start,
+                                    stats.nodes - iteration_nodes)
 
+            # Get the move candidates by checking if they match the best score found.
+            candidates = [s for s in scores if (s[0] == (max(scores, key=lambda s:s[0])[0] \
+                                                         if team else min(scores, key = lambda s:s[0])[0]))]
+            best_score, *best_move = random.choice(candidates)
+            best_move = tuple(best_move)
+
+            # The best root move was searched inside its window, so the root score is exact.
+            self.table.store(board.zobrist, depth + 1, best_score, EXACT, best_move)
+            self.score = best_score
+            stats.table_stores += 1
+            pv = self.principalVariation(board, team, best_move)
+
+            if ponder: self.ponder_pv = pv
+            else: self.pv = pv
+
+            # Next iteration: best move first, then the rest from best to worst score.
+            scores.sort(key=lambda s:s[0], reverse=team)
+            moves = [best_move] + [s[1:] for s in scores if s[1:] != best_move]
+
+            # The next iteration takes longer than all the previous ones, don't
+            # start it if it can't finish.
+            if self.deadline is not None and time.perf_counter() > start + (self.deadline - start) / 2:
+                break
+
+        # Out of time before the first iteration finished.
+        if best_move is None:
+            best_move = moves[0]
+
+        self.deadline = None
+        stats.seconds = time.perf_counter() - start
+
+        return best_move
+
+    def bookMove(self, board: Type[Board]) -> tuple[int] | None:
+        """
+        A move from the opening book for the position (None without a book, if
+        the position isn't in it, or if the book move isn't legal here, which
+        means two positions share a zobrist key).
+        """
+        if self.book is None:
+            return None
+
+        move = self.book.choose(board.zobrist)
+
+        return move if move in board.legal_moves else None
+
+    def ponder(self, board: Type[Board], team: bool, move_count: int) -> None:
+        """
+        After the bot has moved, search the position after team's predicted reply
+        (the next move of the principal variation) in a background thread, using
+        the time the other player spends thinking. move_count is the move count
+        the bot's next calculateBestMove call will get.
+        """
+        if not self.pondering or len(self.pv) < 2:
+            return
+
+        # Search a copy, the board itself is the other player's to move on.
+        position = type(board)()
+        position.unpack(board.pack(team))
+        position.makeBotMove(*self.pv[1])
+        position.generateLegalMoves(not team)
+
+        # The game is over after the predicted move.
+        if not position.legal_moves:
+            return
+
+        self.ponder_key = (position.zobrist, not team, move_count)
+        self.ponder_result, self.ponder_pv, self.deadline = None, [], None
+        self.ponder_start = time.perf_counter()
+        self.ponder_thread = threading.Thread(target=self.ponderSearch, args=(position, not team, move_count),
+                                              daemon=True)
+        self.ponder_thread.start()
+
+    def ponderSearch(self, board: Type[Board], team: bool, move_count: int) -> None:
+        """
+        Body of the ponder thread.
+        """
+        best_move = self.search(board, team, move_count, self.time_limit, ponder=True)
+
+        if not self.stopped:
+            self.ponder_result = best_move
+
+    def stopPondering(self) -> None:
+        """
+        Abort the ponder search, if any (at the end of a game).
+        """
+        if self.ponder_thread is not None:
+            self.stopped = True
+            self.ponder_thread.join()
+            self.ponder_thread, self.stopped = None, False
+
+    def searchIteration(self, board: Type[Board], team: bool, move_count: int, depth: int,
+                        moves: list[tuple[int]]) -> list[tuple]:
+        """
+        Search every root move to the given depth, returning (score, r, c, rx, cx)
+        for each.
+        * With aspiration windows, search inside a narrow window around the last
+          score. Every root move gets the same window, so moves scoring inside it
+          get exact scores (and ties are still found), worse moves only need to
+          be proven worse. If the best score falls outside the window, widen it
+          on that side and search again.
+        """
+        a, b = -math.inf, math.inf
+        pawn = self.engine.material_weight
+        delta = ASPIRATION_WINDOW * pawn
+
+        if self.aspiration and self.score is not None:
+            a, b = self.score - delta, self.score + delta
+
+        while True:
+            if self.workers:
+                scores = self.searchRootParallel(board, team, move_count, depth, moves, a, b)
+            else:
+                scores = self.searchRoot(board, team, move_count, depth, moves, a, b)
+
+            best_score = max(s[0] for s in scores) if team else min(s[0] for s in scores)
+
+            if a < best_score < b:
+                return scores
+
+            # Failed low (high) for the team to move, widen that side.
+            self.stats.aspiration_fails += 1
+            delta *= ASPIRATION_GROWTH
+
+            if best_score <= a: a = -math.inf if delta > ASPIRATION_LIMIT * pawn else self.score - delta
+            else: b = math.inf if delta > ASPIRATION_LIMIT * pawn else self.score + delta
+
+    def searchRoot(self, board: Type[Board], team: bool, move_count: int, depth: int,
+                   moves: list[tuple[int]], a: float = -math.inf, b: float = math.inf) -> list[tuple]:
+        """
+        Search every root move to the given depth with the window a, b (full by
+        default), returning (score, r, c, rx, cx) for each.
+        """
+        scores = []
+
+        for r, c, rx, cx in moves:
             # Test a move.
-            board.makeBotMove(r, c, rx, cx)
-            scores.append((self.minimax(team, self.depth, move_count + 1, 
-                                                -math.inf, math.inf, board), r, c, rx, cx))            
-            board.undo(r, c, rx, cx, piece1, piece2, piece1_moved)
+            board.push((r, c, rx, cx))
+
+            try:
+                scores.append((self.minimax(not team, depth, move_count + 1, a, b, board), r, c, rx, cx))
+            finally:
+                board.pop()
+
+        return scores
+
+    def searchRootParallel(self, board: Type[Board], team: bool, move_count: int, depth: int,
+                           moves: list[tuple[int]], a: float = -math.inf, b: float = math.inf) -> list[tuple]:
+        """
+        searchRoot, with the root moves spread across the worker processes. Every
+        root move is searched with the same window anyway, so the workers don't
+        need to share bounds and the scores are the same as searchRoot's.
+        """
+        if self.pool is None:
+            self.stop_event = multiprocessing.Event()
+            self.pool = ProcessPoolExecutor(self.workers, initializer=initWorker,
+                                            initargs=(self.engine, self.table.size_mb, self.searchOptions(),
+                                                      self.stop_event))
+
+        data = board.pack(team, move_count)
+        remaining = None if self.deadline is None else self.deadline - time.perf_counter()
+        self.stop_event.clear()
+        futures = [self.pool.submit(searchMove, type(board), data, depth, move, a, b, remaining, self.search_id)
+                   for move in moves]
+        scores = []
+
+        try:
+            for (r, c, rx, cx), future in zip(moves, futures):
+                # The workers only watch the deadline themselves, pass a stop on to them.
+                while not future.done():
+                    if self.stopped:
+                        self.stop_event.set()
+                    wait((future,), timeout=STOP_POLL)
+
+                score, stats = future.result()
+                self.stats.merge(stats)
+                scores.append((score, r, c, rx, cx))
 
-            # Revert the control matrix since it was modified in the minimax call.
-            board.revertControlMatrix(r, c, rx, cx, piece1, piece2)
-            board.generatePositionMatrix()
+        # Don't leave the rest of the iteration queued up behind the next search,
+        # or still running when the next one clears stop_event.
+        except SearchTimeout:
+            for future in futures:
+                future.cancel()
+            self.stop_event.set()
+            wait(futures)
+            raise
 
-        # Get the move candidates by checking if they match the best score found.
-        candidates = [s for s in scores if (s[0] == (max(scores, key=lambda s:s[0])[0] \
-                                                     if team else min(scores, key = lambda s:s[0])[0]))]
-        _, best_r, best_c, best_rx, best_cx = random.choice(candidates)
+        return scores
 
-        board.makeBotMove(best_r, best_c, best_rx, best_cx)
+    def searchOptions(self) -> dict:
+        """
+        The constructor options that change how a position is searched, for
+        setting up the same search in a worker process.
+        """
+        return {'lazy_legality': self.lazy_legality, 'move_ordering': self.move_ordering,
+                'quiescence': self.quiescence, 'quiescence_checks': self.quiescence_checks,
+                'pvs': self.pvs, 'null_move': self.null_move, 'late_move_reductions': self.late_move_reductions}
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes (if any were started) and close the
+        opening book.
+        """
+        if self.book is not None:
+            self.book.close()
+            self.book = None
 
-        return best_r, best_c, best_rx, best_cx
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = self.stop_event = None
 
-    def minimax(self, team: bool, depth: int, move_count: int, a: int, b: int, board: Type[Board]) -> int:
+    def principalVariation(self, board: Type[Board], team: bool, move: tuple[int]) -> list[tuple[int]]:
         """
-        For every legal move, try it and its legal moves up to a given depth to 
+        Follow the best moves stored in the transposition table from the root to
+        rebuild the principal variation and return it, remembering the position
+        each PV move was played from so the next iteration searches it first.
+        """
+        pv, self.pv_moves = [], {}
+
+        while move is not None and board.zobrist not in self.pv_moves and len(pv) < MAX_DEPTH:
+            board.generateLegalMoves(team)
+
+            # Table entries can be overwritten (or collide), only follow legal moves.
+            if move not in board.legal_moves: break
+
+            pv.append(move)
+            self.pv_moves[board.zobrist] = move
+
+            board.push(move)
+            move = entry[3] if (entry := self.table.probe(board.zobrist)) is not None else None
+            team = not team
+
+        for _ in pv:
+            board.pop()
+
+        return pv
+
+    def minimax(self, team: bool, depth: int, move_count: int, a: int, b: int, board: Type[Board],
+                allow_null: bool = True) -> int:
+        """
+        For every legal move, try it and its legal moves up to a given depth to
         find the move with the best outcome depending on the team.
-        * With memoization to eliminate repeat calls.
-        * With alpha-beta pruning to prune parts of the game tree (to start, 
+        * With a transposition table to eliminate repeat searches.
+        * With alpha-beta pruning to prune parts of the game tree (to start,
           a (high) = -oo, b (low) = oo).
+        * Optionally with PVS, null move pruning and late move reductions (see
+          Bot.__init__), allow_null is False right after a null move.
         """
+        if (self.stopped or (self.deadline is not None and time.perf_counter() > self.deadline)
+                or (self.stop_event is not None and self.stop_event.is_set())):
+            raise SearchTimeout
 
-        def hashBoard(board: int) -> Tuple[int]:
-            """
-            given a board config, return a tuple with all the board's information.
-            """
-            key = []
-            for r in range(8):
-                for c in range(8):
-                    key.append(board.squares[r][c])
-            return tuple(key)
-    
-        board.generateLegalMoves(team)
+        stats = self.stats
+        stats.nodes += 1
 
-        if board.stalemate(team, move_count): return 0
-        if board.checkmate(team): return (-300 if team else 300) * depth
-        if depth == 0: return self.engine.evaluate(board)
+        if self.node_hook is not None:
+            self.node_hook(board, team, depth, a, b)
 
-        moves = board.legal_moves
-        scores = []
+        key = board.zobrist
+        hash_move = None
+
+        # A result from at least this depth either settles the node or narrows the window.
+        if (entry := self.table.probe(key)) is None:
+            stats.table_misses += 1
+
+        else:
+            stats.table_hits += 1
+            entry_depth, score, bound, hash_move = entry
+
+            if entry_depth >= depth:
+                if bound == EXACT: return score
+                elif bound == LOWER: a = max(a, score)
+                else: b = min(b, score)
+
+                if a >= b: return score
+
+        # Passing is almost always worse than the best move, so if the other team
+        # still can't get back inside the window after a pass, cut off without
+        # generating any moves. Not in check (passing would be illegal) and not
+        # without pieces (zugzwang, where passing would be best). Near the leaves
+        # the reduced search is a quiescence search.
+        if (self.null_move and allow_null and depth > 0 and math.isfinite(b if team else a)
+                and board.piece_material[team] and not board.check(team)):
+            board.makeNullMove()
+
+            try:
+                score = self.minimax(not team, max(depth - 1 - NULL_MOVE_REDUCTION, 0), move_count + 1,
+                                     *((b - NULL_WINDOW, b) if team else (a, a + NULL_WINDOW)), board, False)
+            finally:
+                board.undoNullMove()
+
+            if (score >= b) if team else (score <= a):
+                stats.null_cutoffs += 1
+                return score
+
+        # Alpha-beta cutoffs mean most moves are never tried, so in lazy mode only
+        # find one legal move here and check the rest as they come up.
+        if self.lazy_legality:
+            board.generatePseudoLegalMoves(team)
+            moves, legality = board.pseudo_moves, board.legality
+            no_moves = not board.hasLegalMove(legality)
+
+        else:
+            board.generateLegalMoves(team)
+            moves, legality = board.legal_moves, None
+            no_moves = not moves
+
+        if (move_count == 200) or (no_moves and not board.check(team)): score, bound = 0, EXACT
+        elif no_moves: score, bound = (-300 if team else 300) * (depth + 1), EXACT
+
+        # Quiescence scores outside the window are only bounds.
+        elif depth == 0 and self.quiescence:
+            score = self.quiescenceSearch(team, a, b, board)
+            bound = UPPER if score <= a else (LOWER if score >= b else EXACT)
+
+        elif depth == 0:
+            score, bound = self.engine.evaluate(board), EXACT
+            stats.evaluations += 1
+        else: score = None
+
+        if score is not None:
+            self.table.store(key, depth, score, bound, None)
+            stats.table_stores += 1
+            return score
+
+        a_start, b_start = a, b
+        best_score, best_move = (-math.inf if team else math.inf), None
+
+        # Try the previous iteration's PV move, or else the best move from an
+        # earlier search, first.
+        first, ply = self.pv_moves.get(key, hash_move), move_count - self.root_move_count
+
+        if self.move_ordering:
+            moves = self.orderer.order(board, team, moves, ply, first)
+
+        elif first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+
+        tried, in_check = 0, self.late_move_reductions and board.check(team)
 
         for r, c, rx, cx in moves:
-            score = 0
-            piece1, piece2 = board.squares[r][c], board.squares[rx][cx]
-            piece1_moved = piece1.moved if hasattr(piece1, 'moved') else None
+            if legality is not None and not board.isLegal(r, c, rx, cx, legality):
+                continue
+
+            tried += 1
+
+            reduce = (self.late_move_reductions and tried > LMR_MOVES and depth >= LMR_DEPTH and not in_check
+                      and self.orderer.category(board, (r, c, rx, cx), ply, first) == QUIET)
 
             # Test a move and store the output.
-            board.makeBotMove(r, c, rx, cx)
-            key = hashBoard(board)
+            board.push((r, c, rx, cx))
+
+            try:
+                if tried == 1 or not (self.pvs or reduce):
+                    score = self.minimax(not team, depth - 1, move_count + 1, a, b, board)
+
+                else:
+                    # Only prove the move is no better than the best one so far.
+                    window = ((a, a + NULL_WINDOW) if team else (b - NULL_WINDOW, b)) if self.pvs else (a, b)
+                    score = self.minimax(not team, depth - 1 - reduce, move_count + 1, *window, board)
+
+                    if reduce:
+                        stats.reductions += 1
+
+                        if (score > a) if team else (score < b):
+                            stats.re_searches += 1
+                            score = self.minimax(not team, depth - 1, move_count + 1, *window, board)
+
+                    # Better than the best so far, find out by how much.
+                    if self.pvs and a < score < b:
+                        stats.re_searches += 1
+                        score = self.minimax(not team, depth - 1, move_count + 1, a, b, board)
+
+            # Undo the move and revert the game state (also when out of time).
+            finally:
+                board.pop()
 
-            if key in self.cache:
-                scores.append(score := self.cache[key])
-            
-            else:
-                scores.append(score := self.minimax(not team, depth - 1, move_count + 1, a, b, board))
-                self.cache[key] = score
-
-            # Undo the move and revert the game state.
-            board.undo(r, c, rx, cx, piece1, piece2, piece1_moved)
-            board.revertControlMatrix(r, c, rx, cx, piece1, piece2)
-            board.generatePositionMatrix()
-            
             # Maximizing.
             if team:
+                if score > best_score: best_score, best_move = score, (r, c, rx, cx)
                 a = max(a, score)
-            
+
             # Minimizing
             else:
+                if score < best_score: best_score, best_move = score, (r, c, rx, cx)
                 b = min(b, score)
 
             # This branch will never be chosen.
-            if a > b: break
+            if a >= b:
+                stats.cutoff(tried - 1, category=self.orderer.category(board, best_move, ply, first))
+
+                if self.move_ordering:
+                    self.orderer.cutoff(board, team, best_move, ply, depth)
+
+                break
+
+        # Scores outside the starting window are only bounds on the true score.
+        if best_score <= a_start: bound = UPPER
+        elif best_score >= b_start: bound = LOWER
+        else: bound = EXACT
+
+        self.table.store(key, depth, best_score, bound, best_move)
+        stats.table_stores += 1
+
+        return best_score
+
+    def quiescenceSearch(self, team: bool, a: float, b: float, board: Type[Board], ply: int = 0) -> float:
+        """
+        Keep searching captures (and promotions) past depth 0 until the position
+        is quiet, so a leaf is never scored in the middle of an exchange.
+        * Stand pat: the side to move doesn't have to capture, so the static
+          evaluation is already a bound on the score.
+        * Delta pruning: skip captures that can't bring the score up to the
+          window even when winning the captured piece with a margin to spare.
+        * Skip captures that lose material outright: a piece taking a less
+          valuable one on a defended square.
+        * With quiescence_checks, also try the quiet moves that give check in the
+          first QUIESCENCE_CHECK_PLIES plies (ply counts them), and a side in
+          check tries every reply instead of standing pat (and is mated if there
+          is none).
+        """
+        if (self.stopped or (self.deadline is not None and time.perf_counter() > self.deadline)
+                or (self.stop_event is not None and self.stop_event.is_set())):
+            raise SearchTimeout
+
+        stats = self.stats
+        stats.quiescence_nodes += 1
+        evasions = self.quiescence_checks and board.check(team)
+        checks = ()
+
+        if evasions:
+            board.generateLegalMoves(team)
+            moves, best_score = board.legal_moves, (-math.inf if team else math.inf)
+
+            if not moves:
+                return -300 if team else 300
+
+        else:
+            stand_pat = best_score = self.engine.evaluate(board)
+            stats.evaluations += 1
+
+            if team:
+                if stand_pat >= b: return stand_pat
+                a = max(a, stand_pat)
+
+            else:
+                if stand_pat <= a: return stand_pat
+                b = min(b, stand_pat)
+
+            board.generateCaptures(team)
+            moves = board.capture_moves
+
+            if self.quiescence_checks and ply < QUIESCENCE_CHECK_PLIES:
+                checks = self.quietChecks(board, team)
+                moves = moves + checks
+
+        for r, c, rx, cx in self.orderer.order(board, team, moves, 0, None):
+            # Checks aren't pruned, they win nothing straight away.
+            if not evasions and (r, c, rx, cx) not in checks:
+                victim = self.orderer.victim(board, r, c, rx, cx)
+                gain = (victim + DELTA_MARGIN) * self.engine.material_weight
+
+                # The skipped capture could still have scored up to stand_pat + gain,
+                # so the bound returned has to allow for it.
+                if (stand_pat + gain <= a) if team else (stand_pat - gain >= b):
+                    best_score = max(best_score, stand_pat + gain) if team else min(best_score, stand_pat - gain)
+                    continue
+
+                if victim < board.squares[r][c].value and board.capturedBack(r, c, rx, cx): continue
+
+            board.push((r, c, rx, cx))
+
+            try:
+                score = self.quiescenceSearch(not team, a, b, board, ply + 1)
+
+            finally:
+                board.pop()
+
+            if team:
+                best_score = max(best_score, score)
+                a = max(a, score)
+
+            else:
+                best_score = min(best_score, score)
+                b = min(b, score)
+
+            if a >= b: break
+
+        return best_score
+
+    def quietChecks(self, board: Type[Board], team: bool) -> list[tuple[int]]:
+        """
+        Legal moves of team that capture nothing and don't promote (those are
+        already in the captures) but put the other team in check.
+        """
+        board.generatePseudoLegalMoves(team)
+        legality, checks = board.legality, []
+
+        for r, c, rx, cx in board.pseudo_moves:
+            if board.squares[rx][cx] is not None or (board.squares[r][c].kind == PAWN and rx in (0, 7)):
+                continue
+
+            if not board.isLegal(r, c, rx, cx, legality):
+                continue
+
+            board.push((r, c, rx, cx))
+            check = board.check(not team)
+            board.pop()
+
+            if check:
+                checks.append((r, c, rx, cx))
+
+        return checks
+
+WORKER_BOT = None # The Bot of a worker process, see Bot.searchRootParallel.
+
+def initWorker(engine: Type[Engine], table_size: int, options: dict, stop_event: object) -> None:
+    """
+    Set up a worker process's bot (with the options of Bot.searchOptions), which
+    keeps its transposition table and move ordering history between root moves
+    and searches, and stops searching when the main process sets stop_event.
+    """
+    global WORKER_BOT
+    WORKER_BOT = Bot(0, engine, table_size, **options)
+    WORKER_BOT.stop_event = stop_event
+
+def searchMove(board_type: type, data: bytes, depth: int, move: tuple[int], a: float, b: float,
+               remaining: float | None, search_id: int) -> tuple:
+    """
+    Search one root move of a packed position (Board.pack, with the side to
+    move and move count) with the window a, b in a worker process, returning
+    its score and the search stats. search_id is the main bot's, the first root
+    move of a new search ages the worker's table and move ordering like
+    Bot.search does.
+    """
+    bot, board = WORKER_BOT, board_type()
+    team, move_count = board.unpack(data)
+
+    if bot.search_id != search_id:
+        bot.table.newSearch()
+        bot.orderer.newSearch()
+        bot.search_id = search_id
+
+    bot.stats = SearchStats()
+    bot.root_move_count = move_count
+    bot.deadline = None if remaining is None else time.perf_counter() + remaining
+
+    board.makeBotMove(*move)
+    score = bot.minimax(not team, depth, move_count + 1, a, b, board)
 
-        return max(scores) if team else min(scores)
\ No newline at end of file
+    return score, bot.stats
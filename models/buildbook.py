@@ -0,0 +1,191 @@
+"""
+Build an opening book (see book.py) from games in PGN: standard algebraic
+notation, UCI coordinates like e2e4 or the game's own rcRC moves, so
+tournament.py's logs work too. Every position in the first plies of each game
+gets a record for the move played, weighted by how it went for the side that
+played it.
+
+Usage: python -m models.buildbook FILE [FILE ...] --out BOOK [--plies N]
+       python -m models.buildbook --probe BOOK [--fen FEN]
+"""
+
+import argparse
+import re
+from typing import Iterable, Iterator
+from models.bitboard import BitboardBoard
+from models.book import OpeningBook
+from models.perft import START
+from models.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from models.transposition import encodeMove
+
+BOOK_PLIES = 16 # Plies of each game added to the book.
+# Weight a move gets from each game, by the result for the side that played it.
+WIN_WEIGHT, DRAW_WEIGHT, LOSS_WEIGHT = 2, 1, 0
+MAX_WEIGHT = 0xFFFF
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+SAN_PIECES = {'N': Knight, 'B': Bishop, 'R': Rook, 'Q': Queen, 'K': King}
+PROMOTIONS = {'N': 'Knight', 'B': 'Bishop', 'R': 'Rook', 'Q': 'Queen'}
+SAN = re.compile(r'([NBRQK])?([a-h])?([1-8])?x?([a-h])([1-8])(?:=?([NBRQ]))?')
+COORDINATES = re.compile(r'([a-h])([1-8])([a-h])([1-8])([nbrq])?')
+
+def writeBook(weights: dict[tuple[int, int], int], path: str) -> int:
+    """
+    Write {(key, encoded move): weight} as a book file, dropping moves with no
+    weight. Returns the number of records.
+    """
+    records = sorted((key, move, min(weight, MAX_WEIGHT)) for (key, move), weight in weights.items() if weight > 0)
+
+    with open(path, 'wb') as file:
+        for record in records:
+            file.write(OpeningBook.RECORD.pack(*record))
+
+    return len(records)
+
+def readGames(lines: Iterable[str]) -> Iterator[tuple[dict, list[str]]]:
+    """
+    (tags, move texts) of each game of a PGN file. Comments, variations, move
+    numbers and annotations are dropped, the game ends at its result.
+    """
+    tags, tokens, movetext = {}, [], ''
+
+    for line in lines:
+        line = line.strip()
+
+        if line.startswith('['):
+            if match := re.match(r'\[(\w+)\s+"(.*)"\]', line):
+                tags[match.group(1)] = match.group(2)
+            continue
+
+        if line.startswith('%'):
+            continue
+
+        movetext += ' ' + line.split(';')[0]
+
+        # Only split into moves once the game's result is in.
+        if not any(result in movetext.split() for result in RESULTS):
+            continue
+
+        text = re.sub(r'\{[^}]*\}', ' ', movetext)
+        depth, flat = 0, ''
+
+        # Variations can nest, drop everything inside parentheses.
+        for char in text:
+            depth += (char == '(') - (char == ')')
+            if depth == 0 and char != ')': flat += char
+
+        for token in flat.split():
+            token = re.sub(r'^\d+\.+', '', token)
+
+            if token in RESULTS:
+                tags.setdefault('Result', token)
+                yield tags, tokens
+                tags, tokens = {}, []
+                break
+
+            if token and not token.startswith('$'):
+                tokens.append(token)
+
+        movetext = ''
+
+def parseMove(board: BitboardBoard, team: bool, text: str) -> tuple[tuple[int], str] | None:
+    """
+    The legal move (and the piece a promotion makes) written as text, in
+    standard algebraic notation, UCI coordinates or the game's rcRC digits.
+    None if it isn't a legal move (board.legal_moves must be up to date).
+    """
+    text = text.rstrip('+#!?')
+    row = 7 if team else 0
+    move, promotion = None, 'Queen'
+
+    if len(text) == 4 and text.isdigit():
+        move = tuple(map(int, text))
+
+    elif text in ('O-O', '0-0'):
+        move = (row, 4, row, 6)
+
+    elif text in ('O-O-O', '0-0-0'):
+        move = (row, 4, row, 2)
+
+    elif match := COORDINATES.fullmatch(text):
+        file, rank, filex, rankx, piece = match.groups()
+        move = (8 - int(rank), 'abcdefgh'.index(file), 8 - int(rankx), 'abcdefgh'.index(filex))
+        promotion = PROMOTIONS[(piece or 'q').upper()]
+
+    elif match := SAN.fullmatch(text):
+        piece, file, rank, filex, rankx, piece_promotion = match.groups()
+        cls, rx, cx = SAN_PIECES.get(piece, Pawn), 8 - int(rankx), 'abcdefgh'.index(filex)
+        candidates = [m for m in board.legal_moves if m[2:] == (rx, cx)
+                      and board.squares[m[0]][m[1]].kind == cls.kind
+                      and (file is None or m[1] == 'abcdefgh'.index(file))
+                      and (rank is None or m[0] == 8 - int(rank))]
+        move = candidates[0] if len(candidates) == 1 else None
+        promotion = PROMOTIONS[piece_promotion or 'Q']
+
+    return (move, promotion) if move in board.legal_moves else None
+
+def buildBook(games: Iterable[tuple[dict, list[str]]], path: str, plies: int = BOOK_PLIES) -> tuple[int, int]:
+    """
+    Build a book from (tags, move texts) games, adding the first plies of
+    each. A game stops being added at a move that can't be read. Returns the
+    number of games used and of records written.
+    """
+    board, weights, used = BitboardBoard(), {}, 0
+
+    for tags, moves in games:
+        try:
+            team, _ = board.loadFen(tags.get('FEN', START))
+        except (ValueError, IndexError, KeyError):
+            continue
+
+        result = tags.get('Result', '*')
+        used += 1
+
+        for text in moves[:plies]:
+            board.generateLegalMoves(team)
+
+            if (parsed := parseMove(board, team, text)) is None:
+                break
+
+            move, promotion = parsed
+            won = '1-0' if team else '0-1'
+            weight = WIN_WEIGHT if result == won else DRAW_WEIGHT if result in ('1/2-1/2', '*') else LOSS_WEIGHT
+            key = (board.zobrist, encodeMove(move))
+            weights[key] = weights.get(key, 0) + weight
+
+            board.makeHumanMove(*move, promotion)
+            team = not team
+
+    return used, writeBook(weights, path)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Build an opening book from PGN files (or tournament logs).')
+    parser.add_argument('files', nargs='*')
+    parser.add_argument('--out', help='book file to write')
+    parser.add_argument('--plies', type=int, default=BOOK_PLIES, help='plies of each game to add')
+    parser.add_argument('--probe', metavar='BOOK', help='list the book moves of --fen instead')
+    parser.add_argument('--fen', default=START, help='position to probe (default: start position)')
+    args = parser.parse_args()
+
+    if args.probe:
+        board, book = BitboardBoard(), OpeningBook(args.probe)
+        board.loadFen(args.fen)
+
+        for move, weight in sorted(book.entries(board.zobrist), key=lambda entry: -entry[1]):
+            print(f'{"".join(map(str, move))}: {weight}')
+
+        book.close()
+        return
+
+    if not args.files or not args.out:
+        parser.error('give the game files and --out')
+
+    def games() -> Iterator[tuple[dict, list[str]]]:
+        for name in args.files:
+            with open(name) as file:
+                yield from readGames(file)
+
+    used, records = buildBook(games(), args.out, args.plies)
+    print(f'{records} records from {used} games written to {args.out}')
+
+if __name__ == '__main__':
+    main()
@@ -1,71 +1,24 @@
 from typing import Type
 from .board import Board
+from .scores import POSITION_SCORES, POSITION_VALUES
+
+# Default evaluation weights (see Engine).
+POSITION_WEIGHT = 0.15
+MATERIAL_WEIGHT = 46 # Evaluation of one pawn of material.
+CONTROL_SCORE = 1
 
 class Engine:
-    def __init__(self):
-        # From Rustic Chess.
-        self.position_scores = {
-            "Pawn" : [  
-                0,  0,  0,  0,  0,  0,  0,  0,
-                50, 50, 50, 50, 50, 50, 50, 50,
-                10, 10, 20, 30, 30, 20, 10, 10,
-                5,  5, 10, 25, 25, 10,  5,  5,
-                0,  0,  0, 20, 20,  0,  0,  0,
-                5, -5,-10,  0,  0,-10, -5,  5,
-                5, 10, 10,-20,-20, 10, 10,  5,
-                0,  0,  0,  0,  0,  0,  0,  0
-            ],
-            'Knight' : [
-                -50,-40,-30,-30,-30,-30,-40,-50,
-                -40,-20,  0,  0,  0,  0,-20,-40,
-                -30,  0, 10, 15, 15, 10,  0,-30,
-                -30,  5, 15, 20, 20, 15,  5,-30,
-                -30,  0, 15, 20, 20, 15,  0,-30,
-                -30,  5, 10, 15, 15, 10,  5,-30,
-                -40,-20,  0,  5,  5,  0,-20,-40,
-                -50,-40,-30,-30,-30,-30,-40,-50
-            ],
-            'Bishop' : [
-                -20,-10,-10,-10,-10,-10,-10,-20,
-                -10,  0,  0,  0,  0,  0,  0,-10,
-                -10,  0,  5, 10, 10,  5,  0,-10,
-                -10,  5,  5, 10, 10,  5,  5,-10,
-                -10,  0, 10, 10, 10, 10,  0,-10,
-                -10, 10, 10, 10, 10, 10, 10,-10,
-                -10,  5,  0,  0,  0,  0,  5,-10,
-                -20,-10,-10,-10,-10,-10,-10,-20
-            ],
-            'Rook' : [
-                0,  0,  0,  0,  0,  0,  0,  0,
-                5, 10, 10, 10, 10, 10, 10,  5,
-                -5,  0,  0,  0,  0,  0,  0, -5,
-                -5,  0,  0,  0,  0,  0,  0, -5,
-                -5,  0,  0,  0,  0,  0,  0, -5,
-                -5,  0,  0,  0,  0,  0,  0, -5,
-                -5,  0,  0,  0,  0,  0,  0, -5,
-                0,  0,  0,  5,  5,  0,  0,  0
-            ],
-            'Queen' : [
-                -20,-10,-10, -5, -5,-10,-10,-20,
-                -10,  0,  0,  0,  0,  0,  0,-10,
-                -10,  0,  5,  5,  5,  5,  0,-10,
-                -5,  0,  5,  5,  5,  5,  0, -5,
-                0,  0,  5,  5,  5,  5,  0, -5,
-                -10,  5,  5,  5,  5,  5,  0,-10,
-                -10,  0,  5,  0,  0,  0,  0,-10,
-                -20,-10,-10, -5, -5,-10,-10,-20
-            ],
-            'King' : [
-                -30,-40,-40,-50,-50,-40,-40,-30,
-                -30,-40,-40,-50,-50,-40,-40,-30,
-                -30,-40,-40,-50,-50,-40,-40,-30,
-                -30,-40,-40,-50,-50,-40,-40,-30,
-                -20,-30,-30,-40,-40,-30,-30,-20,
-                -10,-20,-20,-20,-20,-20,-20,-10,
-                20, 20,  0,  0,  0,  0, 20, 20,
-                20, 30, 10,  0,  0, 10, 30, 20
-            ]
-        }
+    def __init__(self, incremental: bool = True, position_weight: float = POSITION_WEIGHT,
+                 material_weight: float = MATERIAL_WEIGHT, control_score: float = CONTROL_SCORE):
+        self.position_scores = POSITION_SCORES
+        # Weights of the position, material and space-control terms of evaluate,
+        # so that different weightings can play each other (see tournament.py).
+        self.position_weight = position_weight
+        self.material_weight = material_weight
+        self.control_score = control_score
+        # Read the material and position totals the board keeps up to date on every
+        # move instead of rescanning all 64 squares at each leaf.
+        self.incremental = incremental
 
     def materialEvaluate(self, board: Type[Board]) -> int:
         """
@@ -92,9 +45,8 @@ class Engine:
         for r in range(8):
             for c in range(8):
                 if (square := board.squares[r][c]) is not None:
-                    score += self.position_scores[square.__class__.__name__] \
-                        [((r * 8) + c) if square.team else ((7 - r) * 8 + c)] \
-                        * (square.value if square.team else -square.value)
+                    # Position score (flipped for black) times signed value.
+                    score += POSITION_VALUES[square.kind][square.team][r * 8 + c]
         return score
     
     def controlEvaluate(self, board: Type[Board]) -> int:
@@ -106,11 +58,14 @@ class Engine:
         # Example: A white knight is attackign 2 squares. Knights have a score of
         # 3, so the space-control score for the knight would be 3 * 2 = 6.
         score = 0
+        # Read once, boards that build it lazily do so on first access.
+        control = board.control_mtx
 
         for r in range(8):
             for c in range(8):
                 if (square := board.squares[r][c]) is not None:
-                    score += len(board.control_mtx[r][c]) \
+                    # The control matrix holds a bitmask of the controlling squares.
+                    score += control[r][c].bit_count() \
                         * (square.value if square.team else -square.value)
         
         return score
@@ -120,11 +75,14 @@ class Engine:
         Given a board, evaluate the position based on the material, position, and
         space-control advanges.
         """
-        POSITION_WEIGHT = 0.15
-        MATERIAL_WEIGHT = 46
-        CONTROL_SCORE = 1
-        position_score = POSITION_WEIGHT * self.positionEvaluate(board)
-        material_score = MATERIAL_WEIGHT * self.materialEvaluate(board)
-        control_score = CONTROL_SCORE * self.controlEvaluate(board)
+        if self.incremental:
+            position_score = self.position_weight * board.position
+            material_score = self.material_weight * board.material
+
+        else:
+            position_score = self.position_weight * self.positionEvaluate(board)
+            material_score = self.material_weight * self.materialEvaluate(board)
+
+        control_score = self.control_score * self.controlEvaluate(board)
 
         return position_score + material_score + control_score
\ No newline at end of file
@@ -1,13 +1,17 @@
 from models.engine import Engine
 from models.bot import Bot
-from models.board import Board
+from models.board import Board, LazyBoard
+from models.bitboard import BitboardBoard
 from typing import Tuple
 
 class Model:
-    def __init__(self, depth: int):
-        self.board = Board()
+    def __init__(self, depth: int, bitboard: bool = False, time_limit: int | None = None,
+                 lazy_legality: bool = False, workers: int = 0, pondering: bool = False, book: str | None = None,
+                 lazy_control: bool = False):
+        self.board = BitboardBoard() if bitboard else LazyBoard() if lazy_control else Board()
         self.engine = Engine()
-        self.bot = Bot(depth, self.engine)
+        self.bot = Bot(depth, self.engine, time_limit=time_limit, lazy_legality=lazy_legality,
+                       workers=workers, pondering=pondering, book=book)
         self.move_count = 0
 
     def validMove(self, move: Tuple[int]) -> bool:
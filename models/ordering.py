@@ -0,0 +1,104 @@
+from .board import Board
+from .pieces import PAWN
+from typing import Type
+
+# Move categories, in the order they are tried.
+HASH, CAPTURE, KILLER, QUIET = 0, 1, 2, 3
+CATEGORY_NAMES = ('hash', 'capture', 'killer', 'quiet')
+
+class MoveOrderer:
+    """
+    Sorts moves so the ones most likely to cause a cutoff are searched first:
+    1. The hash move (the best move found for the position before).
+    2. Captures and promotions, most valuable victim / least valuable attacker
+       first (MVV-LVA).
+    3. Killer moves: quiet moves that caused a cutoff at the same ply elsewhere
+       in the tree.
+    4. Other quiet moves, by how often they caused cutoffs (history heuristic).
+    """
+    KILLERS = 2 # Killer moves kept per ply.
+
+    def __init__(self):
+        self.killers = [] # killers[ply] = most recent killer moves first.
+        self.history = [0] * (2 * 64 * 64) # Indexed by team, from square, to square.
+
+    def newSearch(self) -> None:
+        """
+        Forget the killers (they belong to the last search's plies) and age the
+        history so the new position's cutoffs soon outweigh the old ones.
+        """
+        self.killers = []
+        self.history = [score // 2 for score in self.history]
+
+    def plyKillers(self, ply: int) -> list:
+        """
+        The killer moves of a ply (plies from the root).
+        """
+        while ply >= len(self.killers):
+            self.killers.append([None] * self.KILLERS)
+
+        return self.killers[ply]
+
+    def victim(self, board: Type[Board], r: int, c: int, rx: int, cx: int) -> int:
+        """
+        Material a move wins: the captured piece plus the queen a promoting
+        pawn becomes (0 for quiet moves).
+        """
+        value = 0 if (target := board.squares[rx][cx]) is None else target.value
+        piece = board.squares[r][c]
+
+        if piece.kind == PAWN and rx in (0, 7):
+            value += 8
+
+        return value
+
+    def category(self, board: Type[Board], move: tuple[int], ply: int, hash_move: tuple[int] | None) -> int:
+        """
+        Which of the groups above a move belongs to.
+        """
+        if move == hash_move: return HASH
+        elif self.victim(board, *move): return CAPTURE
+        elif move in self.plyKillers(ply): return KILLER
+        else: return QUIET
+
+    def order(self, board: Type[Board], team: bool, moves: list[tuple[int]], ply: int,
+              hash_move: tuple[int] | None) -> list[tuple[int]]:
+        """
+        Return the moves sorted best first.
+        """
+        killers, history, squares = self.plyKillers(ply), self.history, board.squares
+        base = (1 << 12) if team else 0
+
+        def key(move: tuple[int]) -> tuple:
+            r, c, rx, cx = move
+
+            if move == hash_move:
+                return (HASH, 0)
+
+            if victim := self.victim(board, r, c, rx, cx):
+                return (CAPTURE, squares[r][c].value - 100 * victim)
+
+            if move in killers:
+                return (KILLER, killers.index(move))
+
+            return (QUIET, -history[base | ((r * 8 + c) << 6) | (rx * 8 + cx)])
+
+        return sorted(moves, key=key)
+
+    def cutoff(self, board: Type[Board], team: bool, move: tuple[int], ply: int, depth: int) -> None:
+        """
+        Remember a move that caused a cutoff (called with the move undone).
+        Only quiet moves are remembered, captures are ordered well already.
+        """
+        r, c, rx, cx = move
+
+        if self.victim(board, r, c, rx, cx):
+            return
+
+        killers = self.plyKillers(ply)
+
+        if move != killers[0]:
+            killers.remove(move if move in killers else killers[-1])
+            killers.insert(0, move)
+
+        self.history[((1 << 12) if team else 0) | ((r * 8 + c) << 6) | (rx * 8 + cx)] += depth * depth
@@ -0,0 +1,196 @@
+"""
+Perft: count every legal move sequence to a fixed depth. The counts are a
+fingerprint of the move generator (any missing or extra move changes them) and
+the time it takes is a benchmark of move generation, make and undo.
+
+Usage: python -m models.perft [--depth N] [--fen FEN] [--divide] [--suite]
+                              [--bitboard | --lazy-control] [--lazy] [--check]
+"""
+
+import argparse
+import time
+from models.board import Board, LazyBoard
+from models.bitboard import BitboardBoard
+from models.scores import materialTotal, pieceMaterial, positionTotal
+from models.zobrist import castlingRights, hashPosition
+
+START = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+# Reference positions with their node counts under this game's rules. The
+# published counts (in the comments) differ where the rules do: there is no en
+# passant, the search always promotes to a queen, and castling only requires the
+# king to be safe after castling (not on or through the squares it crosses).
+# (name, fen, {depth: nodes})
+SUITE = [
+    # 20, 400, 8902, 197281
+    ('start', START,
+     {1: 20, 2: 400, 3: 8902, 4: 197281}),
+    # 48, 2039, 97862
+    ('kiwipete', 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+     {1: 48, 2: 2042, 3: 98100}),
+    # 14, 191, 2812, 43238, 674624
+    ('endgame', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+     {1: 14, 2: 191, 3: 2810, 4: 43087, 5: 671300}),
+    # 6, 264, 9467
+    ('promotions', 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+     {1: 6, 2: 228, 3: 8083}),
+    # 44, 1486, 62379
+    ('discovered', 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+     {1: 41, 2: 1373, 3: 54094}),
+    # 46, 2079, 89890
+    ('middlegame', 'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+     {1: 46, 2: 2079, 3: 89890}),
+]
+
+def legalMoves(board: Board | BitboardBoard, team: bool, lazy: bool) -> list[tuple[int]]:
+    """
+    Legal moves for team, either generated directly or as pseudo-legal moves
+    filtered through the board's lazy legality check.
+    """
+    if lazy:
+        board.generatePseudoLegalMoves(team)
+        legality = board.legality
+        return [m for m in board.pseudo_moves if board.isLegal(*m, legality)]
+
+    board.generateLegalMoves(team)
+    return board.legal_moves
+
+def verify(board: Board | BitboardBoard, team: bool) -> None:
+    """
+    Check everything the board keeps up to date incrementally against a rebuild
+    from its squares.
+    """
+    control, counts = board.control_mtx, getattr(board, 'control_counts', None)
+    board.generateControlMatrix()
+
+    if control != board.control_mtx:
+        raise AssertionError('control matrix out of date')
+
+    if counts != getattr(board, 'control_counts', None):
+        raise AssertionError('control counts out of date')
+
+    if board.pos_mtx != [[cur.team if cur else None for cur in row] for row in board.squares]:
+        raise AssertionError('position matrix out of date')
+
+    if board.castling != castlingRights(board.squares, board.castling):
+        raise AssertionError('castling rights without their king and rook')
+
+    if board.zobrist != hashPosition(board.squares, team, board.castling):
+        raise AssertionError('zobrist key out of date')
+
+    if (board.material, board.position) != (materialTotal(board.squares), positionTotal(board.squares)):
+        raise AssertionError('evaluation totals out of date')
+
+    if board.piece_material != pieceMaterial(board.squares):
+        raise AssertionError('piece material out of date')
+
+def perft(board: Board | BitboardBoard, team: bool, depth: int, lazy: bool = False, check: bool = False) -> int:
+    """
+    Count the leaf nodes of the legal move tree to the given depth.
+    * lazy: generate pseudo-legal moves and filter them with isLegal.
+    * check: verify the board's incremental state after every make and undo
+      (slow, and disables counting the last ply without playing it).
+    """
+    if depth == 0:
+        return 1
+
+    moves = legalMoves(board, team, lazy)
+
+    if depth == 1 and not check:
+        return len(moves)
+
+    nodes = 0
+
+    for move in moves:
+        board.push(move)
+        if check: verify(board, not team)
+        nodes += perft(board, not team, depth - 1, lazy, check)
+
+        board.pop()
+        if check: verify(board, team)
+
+    return nodes
+
+def divide(board: Board | BitboardBoard, team: bool, depth: int, lazy: bool = False,
+           check: bool = False) -> dict[tuple[int], int]:
+    """
+    Perft split by root move, for finding which move a wrong count comes from.
+    """
+    counts = {}
+
+    for move in list(legalMoves(board, team, lazy)):
+        board.push(move)
+        counts[move] = perft(board, not team, depth - 1, lazy, check)
+        board.pop()
+
+    return counts
+
+def timedPerft(board: Board | BitboardBoard, team: bool, depth: int, lazy: bool = False,
+               check: bool = False) -> tuple[int, float]:
+    """
+    Run perft, returning the node count and the seconds it took.
+    """
+    start = time.perf_counter()
+    nodes = perft(board, team, depth, lazy, check)
+
+    return nodes, time.perf_counter() - start
+
+def runSuite(board_type: type, max_depth: int, lazy: bool = False, check: bool = False) -> bool:
+    """
+    Run every reference position up to max_depth, printing each count and speed.
+    Returns True if every count matched.
+    """
+    passed = True
+
+    for name, fen, expected in SUITE:
+        for depth, nodes in sorted(expected.items()):
+            if depth > max_depth:
+                break
+
+            board = board_type()
+            team = board.loadFen(fen)[0]
+            count, seconds = timedPerft(board, team, depth, lazy, check)
+            passed &= count == nodes
+
+            print(f'{"ok  " if count == nodes else "FAIL"} {name:<12} depth {depth}: {count:>9} nodes '
+                  f'(expected {nodes}), {seconds:.2f}s, {count / max(seconds, 1e-9):,.0f} nodes/s')
+
+    return passed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Count and time move generation to a fixed depth.')
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--fen', default=START, help='position to search (default: start position)')
+    parser.add_argument('--divide', action='store_true', help='print the count for each root move')
+    parser.add_argument('--suite', action='store_true', help='check the reference positions up to --depth')
+    parser.add_argument('--bitboard', action='store_true', help='use BitboardBoard instead of Board')
+    parser.add_argument('--lazy-control', action='store_true',
+                        help='use LazyBoard (control matrix built only when read) instead of Board')
+    parser.add_argument('--lazy', action='store_true', help='filter pseudo-legal moves with isLegal')
+    parser.add_argument('--check', action='store_true', help='verify incremental board state at every node')
+    args = parser.parse_args()
+    board_type = BitboardBoard if args.bitboard else LazyBoard if args.lazy_control else Board
+
+    if args.suite:
+        raise SystemExit(0 if runSuite(board_type, args.depth, args.lazy, args.check) else 1)
+
+    board = board_type()
+    team = board.loadFen(args.fen)[0]
+
+    # The divide counts add up to the total, so only one pass is timed (there are
+    # no root moves to divide by at depth 0).
+    if args.divide and args.depth > 0:
+        start = time.perf_counter()
+        counts = divide(board, team, args.depth, args.lazy, args.check)
+        nodes, seconds = sum(counts.values()), time.perf_counter() - start
+
+        for move, count in counts.items():
+            print(f'{"".join(map(str, move))}: {count}')
+
+    else:
+        nodes, seconds = timedPerft(board, team, args.depth, args.lazy, args.check)
+
+    print(f'depth {args.depth}: {nodes} nodes in {seconds:.2f}s ({nodes / max(seconds, 1e-9):,.0f} nodes/s)')
+
+if __name__ == '__main__':
+    main()
@@ -1,40 +1,68 @@
 """
-*******************************************************************************
-NOTE: This is poor design. When I have time, I will go back and clean this up
-      to inherit from a parent Piece class. I will also add more fields and 
-      methods to each child class to reduce repeat code in Board.py.
-*******************************************************************************
+Pieces are flyweights: a piece is only its kind and team, so there is one
+shared instance per kind and team (Pawn(True) always returns the same object)
+and boards can copy, compare and pack their squares without per-piece state.
+Whether pawns, kings and rooks have moved is kept by the board (pawns by their
+row, kings and rooks by the board's castling rights).
 """
 
-class Pawn:
-    def __init__(self, team: bool):
-        self.team = team
-        self.value = 1
-        self.moved = False # For moving up two tiles.
-
-class Knight:
-    def __init__(self, team: bool):
-        self.team = team
-        self.value = 3
-
-class Bishop:
-    def __init__(self, team: bool):
-        self.team = team
-        self.value = 3
-
-class Rook:
-    def __init__(self, team: bool):
-        self.team = team
-        self.value = 5
-        self.moved = False # For castling.
-
-class Queen:
-    def __init__(self, team: bool):
-        self.team = team
-        self.value = 9
-
-class King:
-    def __init__(self, team: bool):
-        self.team = team
-        self.value = 99 # Priceless.
-        self.moved = False # For castling.
\ No newline at end of file
+# Piece kinds, for dispatching on a piece without comparing class names (and
+# the index of its bitboards in BitboardBoard).
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+
+class Piece:
+    __slots__ = ('team',)
+    kind = None
+    value = 0
+
+    def __init_subclass__(cls):
+        # The two instances (black, white) of each kind.
+        cls.INSTANCES = []
+
+        for team in (False, True):
+            piece = object.__new__(cls)
+            piece.team = team
+            cls.INSTANCES.append(piece)
+
+    def __new__(cls, team: bool):
+        return cls.INSTANCES[bool(team)]
+
+    def __reduce__(self) -> tuple:
+        # Unpickle to the shared instance.
+        return self.__class__, (self.team,)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.team})'
+
+class Pawn(Piece):
+    __slots__ = ()
+    kind = PAWN
+    value = 1
+
+class Knight(Piece):
+    __slots__ = ()
+    kind = KNIGHT
+    value = 3
+
+class Bishop(Piece):
+    __slots__ = ()
+    kind = BISHOP
+    value = 3
+
+class Rook(Piece):
+    __slots__ = ()
+    kind = ROOK
+    value = 5
+
+class Queen(Piece):
+    __slots__ = ()
+    kind = QUEEN
+    value = 9
+
+class King(Piece):
+    __slots__ = ()
+    kind = KING
+    value = 99 # Priceless.
+
+# Piece classes by kind.
+PIECES = (Pawn, Knight, Bishop, Rook, Queen, King)
@@ -0,0 +1,96 @@
+from models.pieces import PIECES, PAWN, KING
+
+# From Rustic Chess.
+POSITION_SCORES = {
+    "Pawn" : [  
+        0,  0,  0,  0,  0,  0,  0,  0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5,  5, 10, 25, 25, 10,  5,  5,
+        0,  0,  0, 20, 20,  0,  0,  0,
+        5, -5,-10,  0,  0,-10, -5,  5,
+        5, 10, 10,-20,-20, 10, 10,  5,
+        0,  0,  0,  0,  0,  0,  0,  0
+    ],
+    'Knight' : [
+        -50,-40,-30,-30,-30,-30,-40,-50,
+        -40,-20,  0,  0,  0,  0,-20,-40,
+        -30,  0, 10, 15, 15, 10,  0,-30,
+        -30,  5, 15, 20, 20, 15,  5,-30,
+        -30,  0, 15, 20, 20, 15,  0,-30,
+        -30,  5, 10, 15, 15, 10,  5,-30,
+        -40,-20,  0,  5,  5,  0,-20,-40,
+        -50,-40,-30,-30,-30,-30,-40,-50
+    ],
+    'Bishop' : [
+        -20,-10,-10,-10,-10,-10,-10,-20,
+        -10,  0,  0,  0,  0,  0,  0,-10,
+        -10,  0,  5, 10, 10,  5,  0,-10,
+        -10,  5,  5, 10, 10,  5,  5,-10,
+        -10,  0, 10, 10, 10, 10,  0,-10,
+        -10, 10, 10, 10, 10, 10, 10,-10,
+        -10,  5,  0,  0,  0,  0,  5,-10,
+        -20,-10,-10,-10,-10,-10,-10,-20
+    ],
+    'Rook' : [
+        0,  0,  0,  0,  0,  0,  0,  0,
+        5, 10, 10, 10, 10, 10, 10,  5,
+        -5,  0,  0,  0,  0,  0,  0, -5,
+        -5,  0,  0,  0,  0,  0,  0, -5,
+        -5,  0,  0,  0,  0,  0,  0, -5,
+        -5,  0,  0,  0,  0,  0,  0, -5,
+        -5,  0,  0,  0,  0,  0,  0, -5,
+        0,  0,  0,  5,  5,  0,  0,  0
+    ],
+    'Queen' : [
+        -20,-10,-10, -5, -5,-10,-10,-20,
+        -10,  0,  0,  0,  0,  0,  0,-10,
+        -10,  0,  5,  5,  5,  5,  0,-10,
+        -5,  0,  5,  5,  5,  5,  0, -5,
+        0,  0,  5,  5,  5,  5,  0, -5,
+        -10,  5,  5,  5,  5,  5,  0,-10,
+        -10,  0,  5,  0,  0,  0,  0,-10,
+        -20,-10,-10, -5, -5,-10,-10,-20
+    ],
+    'King' : [
+        -30,-40,-40,-50,-50,-40,-40,-30,
+        -30,-40,-40,-50,-50,-40,-40,-30,
+        -30,-40,-40,-50,-50,-40,-40,-30,
+        -30,-40,-40,-50,-50,-40,-40,-30,
+        -20,-30,-30,-40,-40,-30,-30,-20,
+        -10,-20,-20,-20,-20,-20,-20,-10,
+        20, 20,  0,  0,  0,  0, 20, 20,
+        20, 30, 10,  0,  0, 10, 30, 20
+    ]
+}
+
+# Precomputed per (piece kind, team, square), sq = r * 8 + c. White's totals count as
+# positive and black's as negative, like the Engine evaluations.
+# MATERIAL_VALUES[kind][team]: signed piece value.
+MATERIAL_VALUES = tuple((-cls.value, cls.value) for cls in PIECES)
+
+# POSITION_VALUES[kind][team][sq]: position score (flipped for black) times signed piece value.
+POSITION_VALUES = tuple(([POSITION_SCORES[cls.__name__][(7 - sq // 8) * 8 + sq % 8] * -cls.value for sq in range(64)],
+                         [POSITION_SCORES[cls.__name__][sq] * cls.value for sq in range(64)])
+    for cls in PIECES)
+
+def materialTotal(squares: list) -> int:
+    """
+    Sum of the piece values of white minus black.
+    """
+    return sum(MATERIAL_VALUES[cur.kind][cur.team] for row in squares for cur in row if cur)
+
+def pieceMaterial(squares: list) -> tuple[int, int]:
+    """
+    Sum of the piece values of each team's pieces other than pawns and the
+    king, (black, white).
+    """
+    return (sum(cur.value for row in squares for cur in row if cur and not cur.team and cur.kind not in (PAWN, KING)),
+            sum(cur.value for row in squares for cur in row if cur and cur.team and cur.kind not in (PAWN, KING)))
+
+def positionTotal(squares: list) -> int:
+    """
+    Sum of position score times piece value of white minus black.
+    """
+    return sum(POSITION_VALUES[cur.kind][cur.team][r * 8 + c]
+               for r, row in enumerate(squares) for c, cur in enumerate(row) if cur)
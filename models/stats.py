@@ -0,0 +1,109 @@
+from .ordering import CATEGORY_NAMES
+
+class SearchStats:
+    """
+    Counters collected by the bot over one calculateBestMove call.
+    """
+    def __init__(self):
+        self.nodes = 0 # Positions searched (every minimax call, plus the root).
+        self.quiescence_nodes = 0 # Positions searched past depth 0 (quiescence).
+        self.evaluations = 0 # Leaves scored by the engine.
+        self.table_hits = 0
+        self.table_misses = 0
+        self.table_stores = 0
+        self.null_cutoffs = 0 # Nodes cut off by a null move search.
+        self.reductions = 0 # Moves searched with a late move reduction.
+        self.re_searches = 0 # Reduced or zero window searches that had to be repeated.
+        self.aspiration_fails = 0 # Root searches repeated with a wider aspiration window.
+        self.cutoffs = [] # cutoffs[i] = cutoffs caused by the i-th move tried at a node.
+        # Cutoffs by the kind of move that caused them (hash, capture, killer, quiet).
+        self.cutoff_categories = [0] * len(CATEGORY_NAMES)
+        self.iterations = [] # (depth, seconds, nodes) for each completed iteration.
+        self.seconds = 0.0
+        self.ponder_hit = False # If the search was done while pondering.
+        self.book_move = False # If the move came from the opening book (no search).
+
+    def cutoff(self, index: int, count: int = 1, category: int | None = None) -> None:
+        """
+        Count a cutoff caused by the index-th move tried at a node (and by a move
+        of the given ordering category).
+        """
+        if index >= len(self.cutoffs):
+            self.cutoffs.extend([0] * (index + 1 - len(self.cutoffs)))
+
+        self.cutoffs[index] += count
+
+        if category is not None:
+            self.cutoff_categories[category] += count
+
+    def merge(self, other: 'SearchStats') -> None:
+        """
+        Add the counters of a search done elsewhere (by a worker process).
+        """
+        self.nodes += other.nodes
+        self.quiescence_nodes += other.quiescence_nodes
+        self.evaluations += other.evaluations
+        self.table_hits += other.table_hits
+        self.table_misses += other.table_misses
+        self.table_stores += other.table_stores
+        self.null_cutoffs += other.null_cutoffs
+        self.reductions += other.reductions
+        self.re_searches += other.re_searches
+
+        for index, count in enumerate(other.cutoffs):
+            if count: self.cutoff(index, count)
+
+        for category, count in enumerate(other.cutoff_categories):
+            self.cutoff_categories[category] += count
+
+    def completeIteration(self, depth: int, seconds: float, nodes: int) -> None:
+        """
+        Record an iteration of iterative deepening that searched to depth.
+        """
+        self.iterations.append((depth, seconds, nodes))
+
+    def branchingFactor(self) -> float | None:
+        """
+        Effective branching factor: how many times more nodes the last iteration
+        searched than the one before it (None with fewer than two iterations).
+        """
+        if len(self.iterations) < 2 or self.iterations[-2][2] == 0:
+            return None
+
+        return self.iterations[-1][2] / self.iterations[-2][2]
+
+    def firstMoveCutoffRate(self) -> float | None:
+        """
+        Share of cutoffs caused by the first move tried, a measure of how good
+        the move ordering is (None if there were no cutoffs).
+        """
+        total = sum(self.cutoffs)
+        return self.cutoffs[0] / total if total else None
+
+    def tableHitRate(self) -> float | None:
+        """
+        Share of transposition table probes that found the position.
+        """
+        probes = self.table_hits + self.table_misses
+        return self.table_hits / probes if probes else None
+
+    def summary(self) -> str:
+        """
+        One line summary of the search.
+        """
+        ebf, first, hits = self.branchingFactor(), self.firstMoveCutoffRate(), self.tableHitRate()
+
+        return (f'depth {self.iterations[-1][0] if self.iterations else "-"}, {self.nodes} nodes '
+                f'(+{self.quiescence_nodes} quiescence), '
+                f'{self.evaluations} evals in {self.seconds:.2f}s '
+                f'({(self.nodes + self.quiescence_nodes) / max(self.seconds, 1e-9):,.0f} nodes/s), '
+                f'ebf {"-" if ebf is None else f"{ebf:.2f}"}, '
+                f'first move cutoffs {"-" if first is None else f"{first:.0%}"} '
+                f'({", ".join(f"{name} {count}" for name, count in zip(CATEGORY_NAMES, self.cutoff_categories))}), '
+                f'table hits {"-" if hits is None else f"{hits:.0%}"}, '
+                f'null move cutoffs {self.null_cutoffs}, reductions {self.reductions}, '
+                f're-searches {self.re_searches}, aspiration fails {self.aspiration_fails}'
+                f'{", ponder hit" if self.ponder_hit else ""}{", book move" if self.book_move else ""}')
+
+    def __repr__(self) -> str:
+        return f'SearchStats({self.summary()})'
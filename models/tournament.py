@@ -0,0 +1,247 @@
+"""
+Tournament: play bot against bot to compare two engine weightings or search
+settings. Every game starts from a seeded random opening, and each opening is
+played twice with the colors swapped so neither player gets the better side of
+it more often. Games run in parallel worker processes; the results are written
+as PGN-like logs and summed up as win/draw/loss, Elo difference (with a 95%
+error margin) and average time per move.
+
+Players are given as comma separated options of Engine and Bot, for example
+"depth=2" or "depth=2,material_weight=40,pvs=true".
+
+Usage: python -m models.tournament --a SPEC --b SPEC [--games N] [--workers N]
+                                   [--seed N] [--opening-plies N] [--pgn FILE]
+                                   [--bitboard]
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+from models.board import Board
+from models.bitboard import BitboardBoard
+from models.bot import Bot
+from models.engine import Engine
+
+OPENING_PLIES = 4 # Random moves played from the start position before the bots take over.
+DRAW_MOVE_COUNT = 200 # The game's draw rule (Board.stalemate), in plies.
+ENGINE_OPTIONS = ('position_weight', 'material_weight', 'control_score', 'incremental')
+
+def parsePlayer(spec: str) -> dict:
+    """
+    Options of a player from its spec, "key=value,key=value" with the keys of
+    the Engine and Bot constructors (numbers and true/false are converted, the
+    rest are kept as text, like book=book.bin).
+    """
+    options = {}
+
+    for item in filter(None, spec.split(',')):
+        key, _, value = item.partition('=')
+        key, value = key.strip(), value.strip()
+
+        if value.lower() in ('true', 'false'):
+            options[key] = value.lower() == 'true'
+
+        else:
+            try:
+                options[key] = int(value)
+            except ValueError:
+                try:
+                    options[key] = float(value)
+                except ValueError:
+                    options[key] = value
+
+    return options
+
+def makeBot(options: dict) -> Bot:
+    """
+    A bot (with its own engine) for a player's options.
+    """
+    engine = Engine(**{key: value for key, value in options.items() if key in ENGINE_OPTIONS})
+    bot_options = {key: value for key, value in options.items() if key not in ENGINE_OPTIONS}
+
+    return Bot(bot_options.pop('depth', 2), engine, **bot_options)
+
+def randomOpening(board: Board | BitboardBoard, seed: int, plies: int) -> list[tuple[int]]:
+    """
+    Play plies random legal moves on board (with a generator seeded with seed)
+    and return them. Stops early if the game ends.
+    """
+    rng, moves, team = random.Random(seed), [], True
+
+    for _ in range(plies):
+        board.generateLegalMoves(team)
+
+        if not board.legal_moves:
+            break
+
+        move = rng.choice(sorted(board.legal_moves))
+        board.makeBotMove(*move)
+        moves.append(move)
+        team = not team
+
+    return moves
+
+def playGame(game: int, seed: int, white: dict, black: dict, opening_plies: int, bitboard: bool) -> dict:
+    """
+    Play one game between two players' options from the seeded opening and
+    return its record: the moves, result ('1-0', '0-1' or '1/2-1/2'), how it
+    ended and each side's thinking time and move count.
+    """
+    random.seed(seed) # The bot picks randomly between equally scored moves.
+    board = BitboardBoard() if bitboard else Board()
+    bots = {True: makeBot(white), False: makeBot(black)}
+    opening = randomOpening(board, seed, opening_plies)
+    moves, team, move_count = list(opening), len(opening) % 2 == 0, len(opening)
+    seconds, bot_moves = {True: 0.0, False: 0.0}, {True: 0, False: 0}
+
+    while True:
+        board.generateLegalMoves(team)
+
+        if board.checkmate(team):
+            result, reason = ('0-1' if team else '1-0'), 'checkmate'
+            break
+
+        if board.stalemate(team, move_count):
+            result, reason = '1/2-1/2', 'move limit' if move_count >= DRAW_MOVE_COUNT else 'stalemate'
+            break
+
+        start = time.perf_counter()
+        moves.append(bots[team].calculateBestMove(board, team, move_count))
+        seconds[team] += time.perf_counter() - start
+        bot_moves[team] += 1
+        move_count += 1
+        team = not team
+
+    for bot in bots.values():
+        bot.close()
+
+    return {'game': game, 'seed': seed, 'opening': len(opening), 'moves': moves, 'result': result, 'reason': reason,
+            'seconds': (seconds[True], seconds[False]), 'bot_moves': (bot_moves[True], bot_moves[False])}
+
+def formatGame(record: dict, white: str, black: str) -> str:
+    """
+    PGN-like log of a game between the players named white and black. Moves are
+    in the game's rcRC form, the end of the opening is marked with a comment.
+    """
+    tags = [('Event', 'Tournament'), ('Round', record['game'] + 1), ('White', white), ('Black', black),
+            ('Seed', record['seed']), ('Result', record['result']), ('Termination', record['reason'])]
+    text = ''.join(f'[{tag} "{value}"]\n' for tag, value in tags) + '\n'
+    tokens = []
+
+    for ply, move in enumerate(record['moves']):
+        if ply % 2 == 0:
+            tokens.append(f'{ply // 2 + 1}.')
+
+        tokens.append(''.join(map(str, move)))
+
+        if ply + 1 == record['opening']:
+            tokens.append('{end of opening}')
+
+    return text + ' '.join(tokens + [record['result']]) + '\n\n'
+
+def eloDifference(wins: int, draws: int, losses: int) -> tuple[float, float]:
+    """
+    Elo difference implied by a score, and the margin of its 95% confidence
+    interval (from the standard error of the per game scores). Both are
+    infinite if one side scored every point.
+    """
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+
+    def elo(score: float) -> float:
+        if score <= 0: return -math.inf
+        if score >= 1: return math.inf
+        # + 0.0 turns the -0.0 of an even score into 0.0 (printed -0 otherwise).
+        return -400 * math.log10(1 / score - 1) + 0.0
+
+    if score in (0, 1):
+        return elo(score), math.inf
+
+    deviation = math.sqrt((wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games)
+    error = 1.96 * deviation / math.sqrt(games)
+
+    return elo(score), (elo(min(score + error, 1)) - elo(max(score - error, 0))) / 2
+
+def playGames(a: dict, b: dict, games: int, seed: int, opening_plies: int, bitboard: bool,
+              workers: int) -> Iterator[dict]:
+    """
+    Play the games between a and b (a is white in even games) in workers
+    processes (0 plays them here), yielding the records in game order.
+    """
+    jobs = [(game, seed + game // 2, a if game % 2 == 0 else b, b if game % 2 == 0 else a,
+             opening_plies, bitboard) for game in range(games)]
+
+    if workers == 0:
+        yield from (playGame(*job) for job in jobs)
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        yield from pool.map(playGame, *zip(*jobs))
+
+def runTournament(a_spec: str, b_spec: str, games: int, seed: int = 0, opening_plies: int = OPENING_PLIES,
+                  bitboard: bool = False, workers: int = 0, pgn: str | None = None) -> dict:
+    """
+    Play the tournament, printing each result as it comes in and writing the
+    logs to the pgn file. Returns the totals from a's point of view.
+    """
+    a, b = parsePlayer(a_spec), parsePlayer(b_spec)
+    wins = draws = losses = 0
+    seconds, moves = {'a': 0.0, 'b': 0.0}, {'a': 0, 'b': 0}
+    log = open(pgn, 'w') if pgn else None
+
+    try:
+        for record in playGames(a, b, games, seed, opening_plies, bitboard, workers):
+            a_white = record['game'] % 2 == 0
+            white, black = (a_spec, b_spec) if a_white else (b_spec, a_spec)
+            a_score = {'1-0': 1, '0-1': 0}.get(record['result'], 0.5)
+            a_score = a_score if a_white else 1 - a_score
+
+            wins, draws, losses = wins + (a_score == 1), draws + (a_score == 0.5), losses + (a_score == 0)
+
+            for side, player in ((0, 'a' if a_white else 'b'), (1, 'b' if a_white else 'a')):
+                seconds[player] += record['seconds'][side]
+                moves[player] += record['bot_moves'][side]
+
+            if log is not None:
+                log.write(formatGame(record, white, black))
+                log.flush()
+
+            print(f'game {record["game"] + 1}: {white} - {black} '
+                  f'{record["result"]} ({record["reason"]}, {len(record["moves"])} plies)', flush=True)
+    finally:
+        if log is not None:
+            log.close()
+
+    elo, margin = eloDifference(wins, draws, losses)
+
+    return {'wins': wins, 'draws': draws, 'losses': losses, 'elo': elo, 'margin': margin,
+            'a_move_seconds': seconds['a'] / max(moves['a'], 1), 'b_move_seconds': seconds['b'] / max(moves['b'], 1)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Play bot against bot and compare the two.')
+    parser.add_argument('--a', default='depth=2', help='player a options, like "depth=2,material_weight=40"')
+    parser.add_argument('--b', default='depth=2', help='player b options')
+    parser.add_argument('--games', type=int, default=10, help='games to play (2 per opening)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first opening')
+    parser.add_argument('--opening-plies', type=int, default=OPENING_PLIES, help='random moves before the bots play')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: one per core, 0 plays the games here)')
+    parser.add_argument('--pgn', default=None, help='file to write the game logs to')
+    parser.add_argument('--bitboard', action='store_true', help='use BitboardBoard instead of Board')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    totals = runTournament(args.a, args.b, args.games, args.seed, args.opening_plies, args.bitboard,
+                           args.workers, args.pgn)
+
+    print(f'\n{args.a} vs {args.b}: +{totals["wins"]} ={totals["draws"]} -{totals["losses"]}, '
+          f'Elo difference {totals["elo"]:+.0f} +/- {totals["margin"]:.0f}')
+    print(f'average time per move: a {totals["a_move_seconds"]:.2f}s, b {totals["b_move_seconds"]:.2f}s '
+          f'({time.perf_counter() - start:.1f}s in total)')
+
+if __name__ == '__main__':
+    main()
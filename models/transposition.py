@@ -0,0 +1,95 @@
+from array import array
+from typing import Tuple
+
+# bound types
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results keyed by zobrist key.
+
+    Entries live in parallel arrays (key, depth, score, bound, best move, generation)
+    so the memory use is fixed up front. Each bucket has two slots: the first keeps
+    the deepest result (unless it is from an older search), the second is always
+    replaced.
+    """
+    # Bytes per entry: key (8), depth (1), score (8), bound (1), move (2), generation (1).
+    ENTRY_SIZE = 21
+
+    def __init__(self, size_mb: int = 16):
+        self.size_mb = size_mb
+        self.size = max(1, (size_mb * 1024 * 1024) // (2 * self.ENTRY_SIZE)) # Buckets.
+        slots = 2 * self.size
+        self.keys = array('Q', [0]) * slots
+        self.depths = array('b', [-1]) * slots # -1 means empty.
+        self.scores = array('d', [0]) * slots
+        self.bounds = array('B', [EXACT]) * slots
+        self.moves = array('H', [0]) * slots # 0 means no move.
+        self.generations = array('B', [0]) * slots
+        self.generation = 0
+
+    def newSearch(self) -> None:
+        """
+        Mark entries from earlier searches as stale so deep results from old
+        positions don't hold on to the depth-preferred slots forever.
+        """
+        self.generation = (self.generation + 1) % 256
+
+    def clear(self) -> None:
+        """
+        Empty the table (new arrays are much faster to make than resetting
+        every slot of the old ones).
+        """
+        slots = 2 * self.size
+        self.depths = array('b', [-1]) * slots
+        self.moves = array('H', [0]) * slots
+
+    def probe(self, key: int) -> Tuple | None:
+        """
+        Look up a position, returning (depth, score, bound, move) or None.
+        """
+        i = 2 * (key % self.size)
+
+        for slot in (i, i + 1):
+            if self.keys[slot] == key and self.depths[slot] >= 0:
+                return self.depths[slot], self.scores[slot], self.bounds[slot], decodeMove(self.moves[slot])
+
+        return None
+
+    def store(self, key: int, depth: int, score: float, bound: int, move: Tuple[int] | None) -> None:
+        """
+        Store a search result, preferring to keep the deeper of two results for
+        the depth-preferred slot and otherwise using the always-replace slot.
+        """
+        i = 2 * (key % self.size)
+
+        if (self.keys[i] != key and depth < self.depths[i]
+                and self.generations[i] == self.generation):
+            i += 1
+
+        self.keys[i] = key
+        self.depths[i] = min(depth, 127)
+        self.scores[i] = score
+        self.bounds[i] = bound
+        self.moves[i] = encodeMove(move)
+        self.generations[i] = self.generation
+
+def encodeMove(move: Tuple[int] | None) -> int:
+    """
+    Pack a move (r, c, rx, cx) into 13 bits (0 is reserved for no move).
+    """
+    if move is None:
+        return 0
+
+    r, c, rx, cx = move
+    return ((r << 9) | (c << 6) | (rx << 3) | cx) + 1
+
+def decodeMove(code: int) -> Tuple[int] | None:
+    """
+    Unpack a move packed by encodeMove.
+    """
+    if code == 0:
+        return None
+
+    code -= 1
+    return (code >> 9) & 7, (code >> 6) & 7, (code >> 3) & 7, code & 7
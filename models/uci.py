@@ -0,0 +1,259 @@
+"""
+UCI (Universal Chess Interface) front-end, so the bot can be run by chess GUIs
+and match runners instead of through the prompts of main.py. Searches run on a
+separate thread so stop, isready and quit are still read while it thinks.
+
+Squares are named the UCI way (file a-h from column 0, rank 8 at row 0), so the
+game's move 6444 is e2e4. The game always promotes to a queen, so the bot's
+promotions are sent as q; other promotions are accepted from the GUI.
+
+Usage: python -m models.uci [--bitboard | --lazy-control] [--book FILE] (or python main.py uci)
+"""
+
+import argparse
+import sys
+import threading
+from typing import Iterable, TextIO
+from models.bot import MAX_DEPTH
+from models.model import Model
+from models.pieces import PAWN
+from models.transposition import TranspositionTable
+
+NAME = 'Chess with Artificial Intelligence'
+AUTHORS = 'Will Dufault and Mattheus Faria'
+DEFAULT_DEPTH = 3 # Bot depth (plies - 1) of a go without depth or time limits.
+MOVES_TO_GO = 30 # Moves the remaining clock time is shared over if the GUI doesn't say.
+MOVE_OVERHEAD = 50 # ms kept back from each move for the GUI and process overhead.
+PROMOTIONS = {'n': 'Knight', 'b': 'Bishop', 'r': 'Rook', 'q': 'Queen'}
+
+def squareName(r: int, c: int) -> str:
+    """
+    UCI name of a square, like e2 for 6, 4.
+    """
+    return 'abcdefgh'[c] + str(8 - r)
+
+def moveName(board, move: tuple[int]) -> str:
+    """
+    UCI name of a move (before it's played, for the promotion suffix).
+    """
+    r, c, rx, cx = move
+    promotion = 'q' if board.squares[r][c].kind == PAWN and rx in (0, 7) else ''
+
+    return squareName(r, c) + squareName(rx, cx) + promotion
+
+def parseMove(text: str) -> tuple[tuple[int], str | None]:
+    """
+    A UCI move as (r, c, rx, cx) and the piece a pawn promotes to (None if it
+    doesn't say).
+    """
+    c, r, cx, rx = 'abcdefgh'.index(text[0]), 8 - int(text[1]), 'abcdefgh'.index(text[2]), 8 - int(text[3])
+
+    return (r, c, rx, cx), PROMOTIONS.get(text[4:5])
+
+class UciProtocol:
+    """
+    The state of a UCI session: the model (board, engine and bot) with the
+    position the GUI last set up, and the search thread.
+    """
+    def __init__(self, bitboard: bool = False, output: TextIO = sys.stdout, book: str | None = None,
+                 lazy_control: bool = False):
+        self.model = Model(DEFAULT_DEPTH, bitboard, book=book, lazy_control=lazy_control)
+        self.team = True # Side to move in the current position.
+        self.output = output # Where responses are written.
+        self.search_thread = None
+
+    def send(self, line: str) -> None:
+        print(line, file=self.output, flush=True)
+
+    def run(self, lines: Iterable[str]) -> None:
+        """
+        Handle commands until quit (or the end of the input), then release the
+        bot's book and worker processes.
+        """
+        try:
+            for line in lines:
+                if not self.handle(line):
+                    break
+        finally:
+            self.stop()
+            self.model.bot.close()
+
+    def handle(self, line: str) -> bool:
+        """
+        Handle one command line. Returns False on quit. Unknown commands are
+        ignored, as the protocol asks.
+        """
+        command, *args = line.split() or ['']
+
+        if command == 'uci':
+            self.send(f'id name {NAME}')
+            self.send(f'id author {AUTHORS}')
+            self.send(f'option name Hash type spin default {self.model.bot.table.size_mb} min 1 max 4096')
+            self.send('uciok')
+
+        elif command == 'isready':
+            self.send('readyok')
+
+        elif command == 'setoption':
+            self.setOption(args)
+
+        elif command == 'ucinewgame':
+            self.stop()
+            self.model.bot.table.clear()
+
+        elif command == 'position':
+            self.stop()
+            self.setPosition(args)
+
+        elif command == 'go':
+            self.stop()
+            self.go(args)
+
+        elif command == 'stop':
+            self.stop()
+
+        elif command == 'quit':
+            return False
+
+        return True
+
+    def setOption(self, args: list[str]) -> None:
+        """
+        setoption name Hash value MB: resize the transposition table.
+        """
+        text = ' '.join(args)
+        name, _, value = text.removeprefix('name ').partition(' value ')
+
+        if name.strip().lower() == 'hash' and value.strip().isdigit():
+            self.stop()
+            self.model.bot.table = TranspositionTable(int(value))
+
+    def setPosition(self, args: list[str]) -> None:
+        """
+        position startpos|fen FEN [moves MOVE ...]
+        """
+        board = self.model.board
+        moves = args.index('moves') if 'moves' in args else len(args)
+
+        if args[:1] == ['fen']:
+            # A bad FEN leaves the position as it was.
+            try:
+                self.team, self.model.move_count = board.loadFen(' '.join(args[1:moves]))
+            except (ValueError, IndexError) as error:
+                self.send(f'info string invalid fen: {error}')
+                return
+        else:
+            board.initBoard()
+            self.team, self.model.move_count = True, 0
+
+        # A malformed or illegal move ends the list, the moves before it stay played.
+        for text in args[moves + 1:]:
+            try:
+                move, promotion = parseMove(text)
+            except (ValueError, IndexError):
+                move, promotion = None, None
+
+            board.generateLegalMoves(self.team)
+
+            if move not in board.legal_moves:
+                self.send(f'info string invalid move {text}')
+                break
+
+            board.makeHumanMove(*move, promotion or 'Queen')
+            self.model.updateMoveCount()
+            self.team = not self.team
+
+    def go(self, args: list[str]) -> None:
+        """
+        go [depth N] [movetime MS] [wtime MS btime MS winc MS binc MS movestogo N]
+           [infinite]: start searching the current position on the search thread.
+        """
+        options = {key: int(value) for key, value in zip(args, args[1:]) if value.lstrip('-').isdigit()}
+        bot, time_limit = self.model.bot, None
+        bot.depth = DEFAULT_DEPTH
+
+        if 'infinite' in args:
+            bot.depth = MAX_DEPTH - 1
+
+        elif 'movetime' in options:
+            time_limit = max(options['movetime'] - MOVE_OVERHEAD, 1)
+
+        elif ('wtime' if self.team else 'btime') in options:
+            remaining = options['wtime' if self.team else 'btime']
+            increment = options.get('winc' if self.team else 'binc', 0)
+            time_limit = remaining // options.get('movestogo', MOVES_TO_GO) + increment
+            time_limit = max(min(time_limit, remaining - MOVE_OVERHEAD), 1)
+
+        # UCI depth is in plies, the bot's last iteration searches depth + 1 plies.
+        if 'depth' in options:
+            bot.depth = max(options['depth'] - 1, 0)
+
+        self.search_thread = threading.Thread(target=self.search, args=(time_limit,), daemon=True)
+        self.search_thread.start()
+
+    def search(self, time_limit: int | None) -> None:
+        """
+        Body of the search thread: search, report and send the best move (book
+        moves are sent straight away).
+        """
+        board, bot, team, move_count = self.model.board, self.model.bot, self.team, self.model.move_count
+        board.generateLegalMoves(team)
+
+        if not board.legal_moves:
+            self.send('bestmove 0000')
+            return
+
+        if (move := bot.bookMove(board)) is not None:
+            self.send('info string book move')
+            self.send(f'bestmove {moveName(board, move)}')
+            return
+
+        move = bot.search(board, team, move_count, time_limit)
+        stats = bot.stats
+        depth = stats.iterations[-1][0] if stats.iterations else 0
+        # Centipawns for the side to move.
+        score = round((bot.score or 0) * (1 if team else -1) * 100 / bot.engine.material_weight)
+        nps = int((stats.nodes + stats.quiescence_nodes) / max(stats.seconds, 1e-9))
+
+        self.send(f'info depth {depth} score cp {score} nodes {stats.nodes + stats.quiescence_nodes} '
+                  f'nps {nps} time {int(stats.seconds * 1000)} pv {self.pvNames(bot.pv)}')
+        self.send(f'bestmove {moveName(board, move)}')
+
+    def pvNames(self, pv: list[tuple[int]]) -> str:
+        """
+        The principal variation in UCI names (playing it on the board to get the
+        promotions right, then taking it back).
+        """
+        board, names = self.model.board, []
+
+        for move in pv:
+            names.append(moveName(board, move))
+            board.push(move)
+
+        for _ in pv:
+            board.pop()
+
+        return ' '.join(names)
+
+    def stop(self) -> None:
+        """
+        Stop the search in progress (it still sends its best move) and wait for
+        the search thread.
+        """
+        if self.search_thread is not None:
+            self.model.bot.stopped = True
+            self.search_thread.join()
+            self.search_thread, self.model.bot.stopped = None, False
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Talk UCI on stdin/stdout.')
+    parser.add_argument('--bitboard', action='store_true', help='use BitboardBoard instead of Board')
+    parser.add_argument('--lazy-control', action='store_true',
+                        help='use LazyBoard (control matrix built only when read) instead of Board')
+    parser.add_argument('--book', default=None, help='opening book file (see book.py)')
+    args = parser.parse_args(argv)
+
+    UciProtocol(args.bitboard, book=args.book, lazy_control=args.lazy_control).run(sys.stdin)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import random
+from models.pieces import King, Rook, PIECES
+
+'''
+zobrist hashing: every (piece, team, square), castling right and the side to move gets a fixed
+random 64-bit number, and a position's key is the xor of the numbers for everything in it, so a
+move only has to xor the few numbers it changes
+'''
+
+# castling rights (bit flags)
+WHITE_SHORT, WHITE_LONG, BLACK_SHORT, BLACK_LONG = 1, 2, 4, 8
+ALL_CASTLING = WHITE_SHORT | WHITE_LONG | BLACK_SHORT | BLACK_LONG
+
+# castling rights kept after a move from/to each square (sq = r * 8 + c, king and rook home squares)
+CASTLE_MASK = [ALL_CASTLING] * 64
+CASTLE_MASK[60] &= ~(WHITE_SHORT | WHITE_LONG)
+CASTLE_MASK[63] &= ~WHITE_SHORT
+CASTLE_MASK[56] &= ~WHITE_LONG
+CASTLE_MASK[4] &= ~(BLACK_SHORT | BLACK_LONG)
+CASTLE_MASK[7] &= ~BLACK_SHORT
+CASTLE_MASK[0] &= ~BLACK_LONG
+
+rng = random.Random(20240407)  # fixed seed, keys must be the same between runs
+
+def buildCastlingKeys(right_keys: list) -> list:
+	'''
+	key of every set of castling rights (0 - 15), the xor of the key of each right held
+	'''
+	keys = [0] * 16
+	for rights in range(16):
+		for i, key in enumerate(right_keys):
+			if rights & (1 << i):
+				keys[rights] ^= key
+	return keys
+
+# PIECE_KEYS[kind][team][sq], sq = r * 8 + c
+PIECE_KEYS = [[[rng.getrandbits(64) for _ in range(64)] for _ in range(2)] for _ in PIECES]
+BLACK_TO_MOVE = rng.getrandbits(64)
+# CASTLING_KEYS[rights], xor of one number per right held
+RIGHT_KEYS = [rng.getrandbits(64) for _ in range(4)]
+CASTLING_KEYS = buildCastlingKeys(RIGHT_KEYS)
+
+def castlingRights(squares: list, rights: int = ALL_CASTLING) -> int:
+	'''
+	the given castling rights that still have their king and rook on their home squares (the board
+	keeps track of which ones were lost by moving)
+	'''
+
+	# pieces are shared instances, so identity checks both kind and team
+	held = 0
+	if squares[7][4] is King(True):
+		held |= (WHITE_SHORT if squares[7][7] is Rook(True) else 0) | (WHITE_LONG if squares[7][0] is Rook(True) else 0)
+	if squares[0][4] is King(False):
+		held |= (BLACK_SHORT if squares[0][7] is Rook(False) else 0) | (BLACK_LONG if squares[0][0] is Rook(False) else 0)
+	return held & rights
+
+def hashPosition(squares: list, team: bool, rights: int) -> int:
+	'''
+	full zobrist key of a position with the given team to move (moves update it incrementally)
+	'''
+	key = CASTLING_KEYS[rights] ^ (0 if team else BLACK_TO_MOVE)
+	for r in range(8):
+		for c in range(8):
+			if cur := squares[r][c]:
+				key ^= PIECE_KEYS[cur.kind][cur.team][r * 8 + c]
+	return key